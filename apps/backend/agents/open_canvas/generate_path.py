@@ -6,12 +6,12 @@ from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, System
 from langchain_core.runnables import RunnableConfig
 from langchain_community.document_loaders import FireCrawlLoader
 from pydantic import BaseModel, Field
-from agents.open_canvas.state import OpenCanvasState
+from agents.open_canvas.state import OpenCanvasState, get_messages
 from core.bedrock_client import get_bedrock_model
 from core.utils import (
     format_messages, get_artifact_content, format_artifact_content_with_template,
     extract_urls, create_context_document_messages, get_string_from_content,
-    convert_pdf_to_text, clean_base64, format_artifact_content
+    convert_pdf_to_text, clean_base64, format_artifact_content, DEFAULT_SYSTEM_MSG
 )
 from agents.open_canvas.prompts import (
     ROUTE_QUERY_PROMPT, ROUTE_QUERY_OPTIONS_HAS_ARTIFACTS,
@@ -61,7 +61,7 @@ Now, given their message, determine whether or not they want the contents of tha
 Respond with only 'true' or 'false'."""
         
         response = await model.ainvoke([
-            SystemMessage(content="You are a helpful AI assistant."),
+            DEFAULT_SYSTEM_MSG,
             HumanMessage(content=prompt),
         ])
         
@@ -253,7 +253,7 @@ async def dynamic_determine_path(
     
     artifact_route = "rewriteArtifact" if current_artifact_content else "generateArtifact"
     
-    recent_messages = state.get("_messages", state.get("messages", []))[-3:]
+    recent_messages = get_messages(state)[-3:]
     recent_messages_str = "\n\n".join([
         f"{msg.__class__.__name__}: {get_string_from_content(msg.content)}"
         for msg in recent_messages
@@ -336,7 +336,7 @@ async def generate_path(
     config: RunnableConfig
 ) -> Dict[str, Any]:
     """Generate path/routing node with URL handling, document processing, and dynamic routing."""
-    _messages = state.get("_messages", state.get("messages", []))
+    _messages = get_messages(state)
     new_messages: List[BaseMessage] = []
     
     # Handle context documents
@@ -353,12 +353,16 @@ async def generate_path(
                     # Note: In practice, we'd need to handle this in the state update
                     break
     
+    # The context document message is appended after the existing messages
+    new_human_index = len(_messages) + len(new_messages) - 1
+    
     # Check for explicit routing conditions first
     if state.get("highlightedText"):
         result = {"next": "updateHighlightedText"}
         if new_messages:
             result["messages"] = new_messages
             result["_messages"] = new_messages
+            result["lastHumanIndex"] = new_human_index
         return result
     
     if (state.get("language") or state.get("artifactLength") or 
@@ -367,6 +371,7 @@ async def generate_path(
         if new_messages:
             result["messages"] = new_messages
             result["_messages"] = new_messages
+            result["lastHumanIndex"] = new_human_index
         return result
     
     if state.get("customQuickActionId"):
@@ -374,6 +379,7 @@ async def generate_path(
         if new_messages:
             result["messages"] = new_messages
             result["_messages"] = new_messages
+            result["lastHumanIndex"] = new_human_index
         return result
     
     if state.get("webSearchEnabled"):
@@ -381,6 +387,7 @@ async def generate_path(
         if new_messages:
             result["messages"] = new_messages
             result["_messages"] = new_messages
+            result["lastHumanIndex"] = new_human_index
         return result
     
     # Check for URLs in last message and include contents if needed
@@ -429,6 +436,7 @@ async def generate_path(
     if new_messages:
         result["messages"] = new_messages
         result["_messages"] = new_internal_message_list + new_messages
+        result["lastHumanIndex"] = new_human_index
     elif updated_message_with_contents:
         result["_messages"] = new_internal_message_list
     
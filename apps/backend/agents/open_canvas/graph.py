@@ -6,7 +6,7 @@ from agents.open_canvas.state import OpenCanvasState
 from agents.open_canvas.nodes import (
     generate_path_node,
     route_node,
-    route_after_followup,
+    route_after_post_processing,
     route_post_web_search,
     generate_artifact_node,
     rewrite_artifact_node,
@@ -14,9 +14,8 @@ from agents.open_canvas.nodes import (
     rewrite_artifact_theme_node,
     custom_action_node,
     generate_followup_node,
-    reflect_node,
     clean_state_node,
-    generate_title_node,
+    post_processing_fanout_node,
     summarizer_node,
     web_search_node,
     reply_to_general_input_node,
@@ -34,8 +33,7 @@ builder.add_node("generateArtifact", generate_artifact_node)
 builder.add_node("customAction", custom_action_node)
 builder.add_node("generateFollowup", generate_followup_node)
 builder.add_node("cleanState", clean_state_node)
-builder.add_node("reflect", reflect_node)
-builder.add_node("generateTitle", generate_title_node)
+builder.add_node("postProcessing", post_processing_fanout_node)
 builder.add_node("summarizer", summarizer_node)
 builder.add_node("webSearch", web_search_node)
 builder.add_node("routePostWebSearch", route_post_web_search)
@@ -71,25 +69,17 @@ builder.add_conditional_edges(
     }
 )
 builder.add_edge("replyToGeneralInput", "generateFollowup")
+builder.add_edge("generateFollowup", "cleanState")
+# Reflection and title generation run concurrently in postProcessing
+builder.add_edge("cleanState", "postProcessing")
 builder.add_conditional_edges(
-    "generateFollowup",
-    route_after_followup,
-    {
-        "reflect": "reflect",
-        "cleanState": "cleanState",
-    }
-)
-builder.add_edge("reflect", "cleanState")
-builder.add_conditional_edges(
-    "cleanState",
-    lambda state: state.get("_next_route", END),
+    "postProcessing",
+    route_after_post_processing,
     {
         END: END,
-        "generateTitle": "generateTitle",
         "summarizer": "summarizer",
     }
 )
-builder.add_edge("generateTitle", END)
 builder.add_edge("summarizer", END)
 
 graph = builder.compile()
@@ -4,7 +4,6 @@ Node implementations for Open Canvas graph.
 from .routing import (
     generate_path_node,
     route_node,
-    route_after_followup,
     route_post_web_search,
 )
 from .artifact import (
@@ -20,6 +19,8 @@ from .post_processing import (
     clean_state_node,
     generate_title_node,
     summarizer_node,
+    post_processing_fanout_node,
+    route_after_post_processing,
 )
 from .web_search import web_search_node
 from .general import reply_to_general_input_node
@@ -27,7 +28,6 @@ from .general import reply_to_general_input_node
 __all__ = [
     "generate_path_node",
     "route_node",
-    "route_after_followup",
     "route_post_web_search",
     "generate_artifact_node",
     "rewrite_artifact_node",
@@ -39,6 +39,8 @@ __all__ = [
     "clean_state_node",
     "generate_title_node",
     "summarizer_node",
+    "post_processing_fanout_node",
+    "route_after_post_processing",
     "web_search_node",
     "reply_to_general_input_node",
 ]
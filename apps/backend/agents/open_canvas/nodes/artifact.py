@@ -4,24 +4,25 @@ Artifact generation and modification nodes.
 from typing import Dict, Any
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
-from agents.open_canvas.state import OpenCanvasState
-from core.bedrock_client import get_bedrock_model
+from agents.open_canvas.state import OpenCanvasState, get_recent_human_message, get_messages
+from core.bedrock_client import get_bedrock_model, collect_stream
+from core.config_view import get_config_view
 from core.utils import (
     format_messages, format_reflections, get_model_config,
     get_artifact_content, is_artifact_markdown_content,
     get_formatted_reflections, format_artifact_content_with_template,
     is_thinking_model, extract_thinking_and_response_tokens,
-    estimate_input_size, truncate_content
+    estimate_input_size, truncate_content, NO_REFLECTIONS, DEFAULT_SYSTEM_MSG
 )
 from agents.open_canvas.prompts import (
-    GENERATE_ARTIFACT_PROMPT,
+    GENERATE_ARTIFACT_PROMPT_FN,
     UPDATE_HIGHLIGHTED_TEXT_PROMPT,
     FOLLOWUP_ARTIFACT_PROMPT,
-    CHANGE_ARTIFACT_LANGUAGE_PROMPT,
-    CHANGE_ARTIFACT_READING_LEVEL_PROMPT,
-    CHANGE_ARTIFACT_TO_PIRATE_PROMPT,
-    CHANGE_ARTIFACT_LENGTH_PROMPT,
-    ADD_EMOJIS_TO_ARTIFACT_PROMPT,
+    CHANGE_ARTIFACT_LANGUAGE_PROMPT_FN,
+    CHANGE_ARTIFACT_READING_LEVEL_PROMPT_FN,
+    CHANGE_ARTIFACT_TO_PIRATE_PROMPT_FN,
+    CHANGE_ARTIFACT_LENGTH_PROMPT_FN,
+    ADD_EMOJIS_TO_ARTIFACT_PROMPT_FN,
     CUSTOM_ACTION_REFLECTIONS_PROMPT,
     CUSTOM_ACTION_PREFIX_PROMPT,
     CURRENT_ARTIFACT_PROMPT,
@@ -32,9 +33,37 @@ from agents.open_canvas.rewrite_artifact_utils import (
     build_rewrite_prompt,
     create_new_artifact_content
 )
-from store.store import store
+import store.store as store_module
 import uuid
 
+# Input size budget for generate_artifact_node
+_MAX_SAFE_INPUT_SIZE = 200 * 1024  # 200KB of text
+_RESERVED_SIZE = 2000  # For prompt template and system message
+_NO_REFLECTIONS_SIZE = len(NO_REFLECTIONS)
+
+# Returned by nodes with no state update. LangGraph only reads node results
+# when merging them into state, so this dict must never be mutated.
+_EMPTY_RESULT: Dict[str, Any] = {}
+
+
+def _append_artifact_content(
+    artifact: Dict[str, Any],
+    new_content: Dict[str, Any],
+    new_index: int
+) -> Dict[str, Any]:
+    """Return a copy of the artifact with a new content version appended.
+    
+    Only the outer dict is copied; existing content versions are shared
+    with the previous artifact rather than duplicated. Contents are kept
+    as an immutable tuple so earlier snapshots can't be changed in place.
+    The full artifact is returned (not a delta) because streamed node
+    outputs are read by clients as the whole artifact.
+    """
+    new_artifact = artifact.copy()
+    new_artifact["currentIndex"] = new_index
+    new_artifact["contents"] = (*artifact.get("contents", ()), new_content)
+    return new_artifact
+
 
 async def generate_artifact_node(
     state: OpenCanvasState,
@@ -46,26 +75,26 @@ async def generate_artifact_node(
     # Get reflections (simplified)
     configurable = config.get("configurable", {}) if config else {}
     reflections_dict = configurable.get("reflections", {})
-    reflections = format_reflections(reflections_dict) if reflections_dict else "No reflections found."
+    if reflections_dict:
+        reflections = format_reflections(reflections_dict)
+        reflections_size = estimate_input_size(reflections)
+    else:
+        reflections = NO_REFLECTIONS
+        reflections_size = _NO_REFLECTIONS_SIZE
     
     # Format messages with size limit
-    messages = state.get("_messages", state.get("messages", []))
-    
-    # Estimate maximum safe input size
-    MAX_SAFE_INPUT_SIZE = 200 * 1024  # 200KB of text
-    reflections_size = estimate_input_size(reflections)
-    reserved_size = 2000  # For prompt template and system message
-    available_for_conversation = MAX_SAFE_INPUT_SIZE - reflections_size - reserved_size
+    messages = get_messages(state)
+    available_for_conversation = _MAX_SAFE_INPUT_SIZE - reflections_size - _RESERVED_SIZE
     
     if available_for_conversation > 0:
         conversation = format_messages(messages, max_length=available_for_conversation)
     else:
-        conversation = format_messages(messages, max_length=MAX_SAFE_INPUT_SIZE // 2)
+        conversation = format_messages(messages, max_length=_MAX_SAFE_INPUT_SIZE // 2)
         print(f"Warning: Reflections are very large ({reflections_size} chars). "
               f"Truncating conversation history.", flush=True)
     
     # Build prompt
-    prompt = GENERATE_ARTIFACT_PROMPT.format(
+    prompt = GENERATE_ARTIFACT_PROMPT_FN(
         reflections=reflections,
         conversation=conversation
     )
@@ -73,25 +102,10 @@ async def generate_artifact_node(
     # Use astream for streaming responses
     # Accumulate the full response for the final artifact
     # Note: ChatBedrockConverse returns content as a list of dicts with 'text' keys
-    full_content = ""
-    async for chunk in model.astream([
-        SystemMessage(content="You are a helpful AI assistant."),
+    full_content = await collect_stream(model, [
+        DEFAULT_SYSTEM_MSG,
         HumanMessage(content=prompt),
-    ]):
-        if hasattr(chunk, "content"):
-            if isinstance(chunk.content, str):
-                chunk_content = chunk.content
-            elif isinstance(chunk.content, list):
-                # ChatBedrockConverse returns content as list of dicts: [{'type': 'text', 'text': '...', 'index': 0}]
-                chunk_content = "".join(
-                    item.get("text", "") if isinstance(item, dict) else str(item)
-                    for item in chunk.content
-                )
-            else:
-                chunk_content = str(chunk.content)
-            full_content += chunk_content
-        else:
-            full_content += str(chunk)
+    ])
     
     # Create final response message
     response = AIMessage(content=full_content)
@@ -99,11 +113,11 @@ async def generate_artifact_node(
     # Create artifact without title (title will be set by frontend using thread title)
     artifact = {
         "type": "text",
-        "contents": [{
+        "contents": ({
             "type": "text",
             "index": 1,
             "fullMarkdown": full_content
-        }]
+        },)
     }
     
     return {
@@ -146,31 +160,17 @@ async def update_highlighted_text_node(state: OpenCanvasState, config: RunnableC
     )
     
     # Get recent user message
-    messages = state.get("_messages", state.get("messages", []))
+    messages = get_messages(state)
     recent_user_message = messages[-1] if messages else None
     
     if not recent_user_message or not isinstance(recent_user_message, HumanMessage):
         raise ValueError("Expected a human message")
     
     # Stream model for real-time updates
-    response_content = ""
-    async for chunk in model.astream([
+    response_content = await collect_stream(model, [
         SystemMessage(content=formatted_prompt),
         recent_user_message,
-    ]):
-        if hasattr(chunk, "content"):
-            if isinstance(chunk.content, str):
-                chunk_content = chunk.content
-            elif isinstance(chunk.content, list):
-                chunk_content = "".join(
-                    item.get("text", "") if isinstance(item, dict) else str(item)
-                    for item in chunk.content
-                )
-            else:
-                chunk_content = str(chunk.content)
-            response_content += chunk_content
-        else:
-            response_content += str(chunk)
+    ])
     
     # Update artifact
     contents = artifact.get("contents", [])
@@ -186,24 +186,26 @@ async def update_highlighted_text_node(state: OpenCanvasState, config: RunnableC
     if not prev_content:
         raise ValueError("Previous content not found")
     
-    if markdown_block not in full_markdown:
+    # Locate the block once and splice in the response (only the first occurrence is replaced)
+    block_start = full_markdown.find(markdown_block)
+    if block_start < 0:
         raise ValueError("Selected text not found in current content")
+    block_end = block_start + len(markdown_block)
     
-    new_full_markdown = full_markdown.replace(markdown_block, response_content)
+    new_full_markdown = full_markdown[:block_start] + response_content + full_markdown[block_end:]
     
     # Get the actual maximum version index from storage, not from state
     # because state may only contain the latest version
     from api.threads.store import thread_store
     
-    configurable = config.get("configurable", {}) if config else {}
-    thread_id = configurable.get("thread_id")
+    thread_id = get_config_view(state, config).thread_id
     
     if thread_id:
         try:
             metadata = thread_store.get_artifact_metadata(thread_id)
             if metadata and metadata.get("version_indices"):
-                # Get the maximum version index from metadata
-                max_index = max(metadata["version_indices"])
+                # current_index is the highest stored version index
+                max_index = metadata["current_index"]
                 new_curr_index = max_index + 1
             else:
                 # Fallback to len(contents) + 1 if metadata not available
@@ -222,11 +224,7 @@ async def update_highlighted_text_node(state: OpenCanvasState, config: RunnableC
     }
     
     return {
-        "artifact": {
-            **artifact,
-            "currentIndex": new_curr_index,
-            "contents": contents + [updated_artifact_content],
-        },
+        "artifact": _append_artifact_content(artifact, updated_artifact_content, new_curr_index),
     }
 
 
@@ -270,35 +268,17 @@ async def rewrite_artifact_node(state: OpenCanvasState, config: RunnableConfig)
     )
     
     # Get recent human message
-    messages = state.get("_messages", state.get("messages", []))
-    recent_human_message = None
-    for msg in reversed(messages):
-        if isinstance(msg, HumanMessage):
-            recent_human_message = msg
-            break
+    messages = get_messages(state)
+    recent_human_message = get_recent_human_message(state, messages)
     
     if not recent_human_message:
         raise ValueError("No recent human message found")
     
     # Stream model for real-time updates
-    artifact_content_text = ""
-    async for chunk in model.astream([
+    artifact_content_text = await collect_stream(model, [
         SystemMessage(content=formatted_prompt),
         recent_human_message,
-    ]):
-        if hasattr(chunk, "content"):
-            if isinstance(chunk.content, str):
-                chunk_content = chunk.content
-            elif isinstance(chunk.content, list):
-                chunk_content = "".join(
-                    item.get("text", "") if isinstance(item, dict) else str(item)
-                    for item in chunk.content
-                )
-            else:
-                chunk_content = str(chunk.content)
-            artifact_content_text += chunk_content
-        else:
-            artifact_content_text += str(chunk)
+    ])
     
     # Handle thinking models
     thinking_message = None
@@ -321,13 +301,8 @@ async def rewrite_artifact_node(state: OpenCanvasState, config: RunnableConfig)
         config
     )
     
-    contents = artifact.get("contents", [])
     result = {
-        "artifact": {
-            **artifact,
-            "currentIndex": new_artifact_content["index"],
-            "contents": contents + [new_artifact_content],
-        },
+        "artifact": _append_artifact_content(artifact, new_artifact_content, new_artifact_content["index"]),
     }
     
     if thinking_message:
@@ -360,7 +335,7 @@ async def rewrite_artifact_theme_node(state: OpenCanvasState, config: RunnableCo
     
     # Determine which prompt to use
     if state.get("language"):
-        formatted_prompt = CHANGE_ARTIFACT_LANGUAGE_PROMPT.format(
+        formatted_prompt = CHANGE_ARTIFACT_LANGUAGE_PROMPT_FN(
             newLanguage=state.get("language"),
             artifactContent=artifact_content,
             reflections=reflections
@@ -368,7 +343,7 @@ async def rewrite_artifact_theme_node(state: OpenCanvasState, config: RunnableCo
     elif state.get("readingLevel"):
         reading_level = state.get("readingLevel")
         if reading_level == "pirate":
-            formatted_prompt = CHANGE_ARTIFACT_TO_PIRATE_PROMPT.format(
+            formatted_prompt = CHANGE_ARTIFACT_TO_PIRATE_PROMPT_FN(
                 artifactContent=artifact_content,
                 reflections=reflections
             )
@@ -381,7 +356,7 @@ async def rewrite_artifact_theme_node(state: OpenCanvasState, config: RunnableCo
                 "phd": "PhD student",
             }
             new_reading_level = level_map.get(reading_level, reading_level)
-            formatted_prompt = CHANGE_ARTIFACT_READING_LEVEL_PROMPT.format(
+            formatted_prompt = CHANGE_ARTIFACT_READING_LEVEL_PROMPT_FN(
                 newReadingLevel=new_reading_level,
                 artifactContent=artifact_content,
                 reflections=reflections
@@ -394,13 +369,13 @@ async def rewrite_artifact_theme_node(state: OpenCanvasState, config: RunnableCo
             "longest": "much longer than it currently is",
         }
         new_length = length_map.get(state.get("artifactLength"), state.get("artifactLength"))
-        formatted_prompt = CHANGE_ARTIFACT_LENGTH_PROMPT.format(
+        formatted_prompt = CHANGE_ARTIFACT_LENGTH_PROMPT_FN(
             newLength=new_length,
             artifactContent=artifact_content,
             reflections=reflections
         )
     elif state.get("regenerateWithEmojis"):
-        formatted_prompt = ADD_EMOJIS_TO_ARTIFACT_PROMPT.format(
+        formatted_prompt = ADD_EMOJIS_TO_ARTIFACT_PROMPT_FN(
             artifactContent=artifact_content,
             reflections=reflections
         )
@@ -444,11 +419,7 @@ async def rewrite_artifact_theme_node(state: OpenCanvasState, config: RunnableCo
     }
     
     result = {
-        "artifact": {
-            **artifact,
-            "currentIndex": new_index,
-            "contents": contents + [new_artifact_content],
-        },
+        "artifact": _append_artifact_content(artifact, new_artifact_content, new_index),
     }
     
     if thinking_message:
@@ -467,13 +438,12 @@ async def custom_action_node(state: OpenCanvasState, config: RunnableConfig) ->
     model = get_bedrock_model(config)
     
     # Get user_id from config
-    configurable = config.get("configurable", {}) if config else {}
-    user_id = configurable.get("userId", "anonymous")
+    user_id = get_config_view(state, config).user_id
     
     # Get custom actions from store
     namespace = ["custom_actions", user_id]
     key = "actions"
-    store_item = store.get_item(namespace, key)
+    store_item = store_module.store.get_item(namespace, key)
     
     if not store_item or not store_item.get("value"):
         raise ValueError(f"No custom actions found for user {user_id}.")
@@ -504,12 +474,18 @@ async def custom_action_node(state: OpenCanvasState, config: RunnableConfig) ->
         formatted_prompt = CUSTOM_ACTION_PREFIX_PROMPT.format(custom_instructions=formatted_prompt)
     
     if custom_quick_action.get("includeRecentHistory"):
-        messages = state.get("_messages", state.get("messages", []))
+        messages = get_messages(state)
         recent_messages = messages[-5:] if len(messages) > 5 else messages
-        conversation = "\n".join([
-            f"<{msg.__class__.__name__}>\n{msg.content if isinstance(msg.content, str) else str(msg.content)}\n</{msg.__class__.__name__}>"
-            for msg in recent_messages
-        ])
+        parts = []
+        append = parts.append
+        for msg in recent_messages:
+            # Look up the class name once per message
+            name = type(msg).__name__
+            content = msg.content
+            if type(content) is not str:
+                content = str(content)
+            append(f"<{name}>\n{content}\n</{name}>")
+        conversation = "\n".join(parts)
         formatted_prompt += f"\n\nHere is the recent conversation history:\n<conversation>\n{conversation}\n</conversation>"
     
     # Get artifact content
@@ -524,26 +500,12 @@ async def custom_action_node(state: OpenCanvasState, config: RunnableConfig) ->
     formatted_prompt += f"\n\nHere is the current artifact content:\n<artifact-content>\n{artifact_content}\n</artifact-content>"
     
     # Stream model for real-time updates
-    new_content = ""
-    async for chunk in model.astream([
+    new_content = await collect_stream(model, [
         HumanMessage(content=formatted_prompt),
-    ]):
-        if hasattr(chunk, "content"):
-            if isinstance(chunk.content, str):
-                chunk_content = chunk.content
-            elif isinstance(chunk.content, list):
-                chunk_content = "".join(
-                    item.get("text", "") if isinstance(item, dict) else str(item)
-                    for item in chunk.content
-                )
-            else:
-                chunk_content = str(chunk.content)
-            new_content += chunk_content
-        else:
-            new_content += str(chunk)
+    ])
     
     if not current_artifact_content:
-        return {}
+        return _EMPTY_RESULT
     
     # Create new artifact content
     # Get the actual maximum version index from storage, not from state
@@ -551,15 +513,14 @@ async def custom_action_node(state: OpenCanvasState, config: RunnableConfig) ->
     from api.threads.store import thread_store
     
     contents = artifact.get("contents", [])
-    configurable = config.get("configurable", {}) if config else {}
-    thread_id = configurable.get("thread_id")
+    thread_id = get_config_view(state, config).thread_id
     
     if thread_id:
         try:
             metadata = thread_store.get_artifact_metadata(thread_id)
             if metadata and metadata.get("version_indices"):
-                # Get the maximum version index from metadata
-                max_index = max(metadata["version_indices"])
+                # current_index is the highest stored version index
+                max_index = metadata["current_index"]
                 new_index = max_index + 1
             else:
                 # Fallback to len(contents) + 1 if metadata not available
@@ -578,9 +539,5 @@ async def custom_action_node(state: OpenCanvasState, config: RunnableConfig) ->
     }
     
     return {
-        "artifact": {
-            **artifact,
-            "currentIndex": new_index,
-            "contents": contents + [new_artifact_content],
-        },
+        "artifact": _append_artifact_content(artifact, new_artifact_content, new_index),
     }
@@ -4,11 +4,11 @@ General input handling node for Open Canvas graph.
 from typing import Dict, Any
 from langchain_core.messages import SystemMessage
 from langchain_core.runnables import RunnableConfig
-from agents.open_canvas.state import OpenCanvasState
+from agents.open_canvas.state import OpenCanvasState, get_messages
 from core.bedrock_client import get_bedrock_model
 from core.utils import (
     get_artifact_content, get_formatted_reflections,
-    format_artifact_content_with_template
+    format_artifact_content_with_template, NO_REFLECTIONS
 )
 from agents.open_canvas.prompts import (
     REPLY_TO_GENERAL_INPUT_PROMPT,
@@ -16,6 +16,12 @@ from agents.open_canvas.prompts import (
     NO_ARTIFACT_PROMPT,
 )
 
+# System prompt for a fresh conversation (no artifact, no reflections), which is constant
+_EMPTY_SYSTEM_MSG = SystemMessage(content=REPLY_TO_GENERAL_INPUT_PROMPT.format(
+    reflections=NO_REFLECTIONS,
+    current_artifact_prompt=NO_ARTIFACT_PROMPT
+))
+
 
 async def reply_to_general_input_node(state: OpenCanvasState, config: RunnableConfig) -> Dict[str, Any]:
     """Reply to general input without generating/updating artifact."""
@@ -29,25 +35,28 @@ async def reply_to_general_input_node(state: OpenCanvasState, config: RunnableCo
     current_artifact_content = get_artifact_content(artifact) if artifact else None
     
     # Build prompt
-    if current_artifact_content:
-        current_artifact_prompt = format_artifact_content_with_template(
-            CURRENT_ARTIFACT_PROMPT,
-            current_artifact_content
-        )
+    if not current_artifact_content and reflections == NO_REFLECTIONS:
+        system_message = _EMPTY_SYSTEM_MSG
     else:
-        current_artifact_prompt = NO_ARTIFACT_PROMPT
-    
-    prompt = REPLY_TO_GENERAL_INPUT_PROMPT.format(
-        reflections=reflections,
-        current_artifact_prompt=current_artifact_prompt
-    )
+        if current_artifact_content:
+            current_artifact_prompt = format_artifact_content_with_template(
+                CURRENT_ARTIFACT_PROMPT,
+                current_artifact_content
+            )
+        else:
+            current_artifact_prompt = NO_ARTIFACT_PROMPT
+        
+        system_message = SystemMessage(content=REPLY_TO_GENERAL_INPUT_PROMPT.format(
+            reflections=reflections,
+            current_artifact_prompt=current_artifact_prompt
+        ))
     
     # Get messages
-    messages = state.get("_messages", state.get("messages", []))
+    messages = get_messages(state)
     
     # Invoke model
     response = await model.ainvoke([
-        SystemMessage(content=prompt),
+        system_message,
         *messages,
     ])
     
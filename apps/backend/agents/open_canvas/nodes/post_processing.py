@@ -1,16 +1,22 @@
 """
 Post-processing nodes for Open Canvas graph.
 """
-from typing import Dict, Any, Literal
-from langchain_core.messages import SystemMessage, HumanMessage
+from typing import Dict, Any, List, Literal, Optional
+import asyncio
+import os
+import sys
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
-from agents.open_canvas.state import OpenCanvasState
+from langgraph.graph import END
+from agents.open_canvas.state import OpenCanvasState, get_messages
 from core.bedrock_client import get_bedrock_model
+from core.config_view import get_config_view
 from core.utils import (
     format_messages, get_artifact_content, get_formatted_reflections,
-    estimate_input_size, truncate_content
+    estimate_tokens, truncate_to_tokens, summarize_dropped,
+    split_recent_messages, content_len, NO_REFLECTIONS, DEFAULT_SYSTEM_MSG
 )
-from agents.open_canvas.prompts import FOLLOWUP_ARTIFACT_PROMPT
+from agents.open_canvas.prompts import FOLLOWUP_ARTIFACT_PROMPT_FN
 from agents.reflection.graph import graph as reflection_graph
 from agents.summarizer.graph import graph as summarizer_graph
 from agents.thread_title.graph import graph as thread_title_graph
@@ -18,87 +24,131 @@ from agents.thread_title.graph import graph as thread_title_graph
 # Character limit for summarization (~ 4 chars per token, max tokens of 75000)
 CHARACTER_MAX = 300000
 
+# Token budget for the followup prompt; fits the smallest (128K) context window
+# among the supported Bedrock models
+_MAX_SAFE_INPUT_TOKENS = 100_000
+_RESERVED_TOKENS = 1500  # For prompt template and system message
+_KEEP_RECENT_MESSAGES = 4  # Kept verbatim when the conversation has to be compacted
+
+# Skip the followup model call on chat-only turns where it has nothing to add
+_SKIP_TRIVIAL_FOLLOWUP = os.getenv("OC_SKIP_TRIVIAL_FOLLOWUP", "true").lower() not in ("false", "0", "no")
+
+# Shared "no state update" result; read-only
+_EMPTY_RESULT: Dict[str, Any] = {}
+
+
+def _input_too_large_result() -> Dict[str, Any]:
+    """Build the fallback followup for inputs too large to send."""
+    return {
+        "messages": [AIMessage(
+            content="I apologize, but the input is too large for me to process. "
+                   "Please try with a smaller artifact or shorter conversation history."
+        )]
+    }
+
 
 async def generate_followup_node(
     state: OpenCanvasState,
     config: RunnableConfig
 ) -> Dict[str, Any]:
     """Generate followup message after artifact generation."""
-    model = get_bedrock_model(config)
-    
     # Get artifact content
     artifact = state.get("artifact")
     artifact_content = ""
+    artifact_title = None
     if artifact:
         current_content = get_artifact_content(artifact)
         if current_content:
             artifact_content = current_content.get("fullMarkdown", "")
-    
-    # Get reflections
-    reflections = get_formatted_reflections(config)
+            artifact_title = current_content.get("title")
     
     # Get conversation history
     messages = state.get("messages", [])
     
-    # Estimate maximum safe input size
-    # Bedrock models typically have context windows, but we'll be conservative
-    # Rough estimate: ~200K characters should be safe for most models
-    MAX_SAFE_INPUT_SIZE = 200 * 1024  # 200KB of text
+    # Without an artifact, a short conversation has no followup worth a model call
+    if _SKIP_TRIVIAL_FOLLOWUP and not artifact_content and len(messages) <= 2:
+        return _EMPTY_RESULT
+    
+    # Get reflections; without an assistant_id the store has none to read, so
+    # only reflections passed in through the config can apply
+    if get_config_view(state, config).assistant_id or config.get("configurable", {}).get("reflections"):
+        reflections = get_formatted_reflections(config)
+    else:
+        reflections = NO_REFLECTIONS
+    
+    # Nor does a prompt with neither artifact nor reflections to draw on
+    if _SKIP_TRIVIAL_FOLLOWUP and not artifact_content and reflections == NO_REFLECTIONS:
+        return _EMPTY_RESULT
+    
+    model = get_bedrock_model(config)
     
     # Calculate current sizes
-    artifact_size = estimate_input_size(artifact_content)
-    reflections_size = estimate_input_size(reflections)
+    artifact_tokens = estimate_tokens(artifact_content)
+    reflections_tokens = estimate_tokens(reflections)
     
-    # Calculate available size for conversation
-    # Reserve space for prompt template, system message, and safety margin
-    reserved_size = 5000  # For prompt template and system message
-    available_for_conversation = MAX_SAFE_INPUT_SIZE - artifact_size - reflections_size - reserved_size
+    # Calculate available tokens for conversation
+    available_for_conversation = (
+        _MAX_SAFE_INPUT_TOKENS - artifact_tokens - reflections_tokens - _RESERVED_TOKENS
+    )
     
-    # Format conversation with size limit
+    # Format conversation with token limit
     if available_for_conversation > 0:
-        conversation = format_messages(messages, max_length=available_for_conversation)
+        conversation = format_messages(
+            messages, max_tokens=available_for_conversation, query=artifact_title
+        )
     else:
         # If artifact/reflections are too large, truncate them
-        print(f"Warning: Artifact ({artifact_size} chars) and reflections ({reflections_size} chars) "
-              f"are very large. Truncating conversation history.", flush=True)
-        conversation = "[Conversation history truncated due to large artifact/reflections]"
+        print(f"Warning: Artifact (~{artifact_tokens} tokens) and reflections (~{reflections_tokens} tokens) "
+              f"are very large. Compacting conversation history.", flush=True)
         # Truncate artifact if needed
-        if artifact_size > MAX_SAFE_INPUT_SIZE * 0.6:  # If artifact is > 60% of max
-            artifact_content = truncate_content(artifact_content, int(MAX_SAFE_INPUT_SIZE * 0.5))
+        if artifact_tokens > _MAX_SAFE_INPUT_TOKENS * 0.6:  # If artifact is > 60% of max
+            artifact_content = "...[truncated]" + truncate_to_tokens(
+                artifact_content, int(_MAX_SAFE_INPUT_TOKENS * 0.5), keep_end=True
+            )
+            artifact_tokens = estimate_tokens(artifact_content)
             print(f"Truncated artifact content to {len(artifact_content)} characters", flush=True)
+        
+        # Artifact and reflections alone still overflow; don't build a prompt bound to be rejected
+        if artifact_tokens + reflections_tokens > _MAX_SAFE_INPUT_TOKENS * 1.2:
+            print(f"Error: Input too large before adding conversation. "
+                  f"Artifact: ~{artifact_tokens} tokens, Reflections: ~{reflections_tokens} tokens", flush=True)
+            return _input_too_large_result()
+        
+        # Keep the most recent messages verbatim and summarize the rest
+        recent_messages = messages[-_KEEP_RECENT_MESSAGES:]
+        conversation = summarize_dropped(messages[:-_KEEP_RECENT_MESSAGES])
+        available_for_conversation = (
+            _MAX_SAFE_INPUT_TOKENS - artifact_tokens - reflections_tokens - _RESERVED_TOKENS
+            - estimate_tokens(conversation)
+        )
+        if recent_messages and available_for_conversation > 0:
+            conversation += "\n" + format_messages(recent_messages, max_tokens=available_for_conversation)
     
     # Build prompt
-    prompt = FOLLOWUP_ARTIFACT_PROMPT.format(
+    prompt = FOLLOWUP_ARTIFACT_PROMPT_FN(
         artifactContent=artifact_content,
         reflections=reflections,
         conversation=conversation
     )
     
     # Final safety check
-    total_size = estimate_input_size(prompt)
-    if total_size > MAX_SAFE_INPUT_SIZE * 1.2:  # 20% safety margin
-        print(f"Warning: Total prompt size ({total_size} chars) exceeds safe limit. "
+    total_tokens = estimate_tokens(prompt)
+    if total_tokens > _MAX_SAFE_INPUT_TOKENS * 1.2:  # 20% safety margin
+        print(f"Warning: Total prompt size (~{total_tokens} tokens) exceeds safe limit. "
               f"Attempting to send anyway, but may fail.", flush=True)
     
     try:
         response = await model.ainvoke([
-            SystemMessage(content="You are a helpful AI assistant."),
+            DEFAULT_SYSTEM_MSG,
             HumanMessage(content=prompt),
         ])
     except Exception as e:
         error_msg = str(e)
         if "too long" in error_msg.lower() or "Input is too long" in error_msg:
-            print(f"Error: Input too long ({total_size} chars). "
-                  f"Artifact: {artifact_size}, Reflections: {reflections_size}, "
-                  f"Conversation: {len(conversation)}", flush=True)
-            # Return a fallback message
-            from langchain_core.messages import AIMessage
-            return {
-                "messages": [AIMessage(
-                    content="I apologize, but the input is too large for me to process. "
-                           "Please try with a smaller artifact or shorter conversation history."
-                )]
-            }
+            print(f"Error: Input too long (~{total_tokens} tokens). "
+                  f"Artifact: ~{artifact_tokens} tokens, Reflections: ~{reflections_tokens} tokens, "
+                  f"Conversation: {len(conversation)} chars", flush=True)
+            return _input_too_large_result()
         raise
     
     return {
@@ -112,14 +162,12 @@ async def reflect_node(
 ) -> Dict[str, Any]:
     """Reflect on conversation and artifact."""
     # Check if assistant_id is available
-    configurable = config.get("configurable", {}) if config else {}
-    assistant_id = configurable.get("open_canvas_assistant_id")
+    assistant_id = get_config_view(state, config).assistant_id
     
     # Skip reflection if assistant_id is not available
     if not assistant_id:
-        import sys
         print("Skipping reflection: Assistant ID is not available.", file=sys.stderr, flush=True)
-        return {}
+        return _EMPTY_RESULT
     
     # Use reflection graph with error handling
     try:
@@ -128,15 +176,34 @@ async def reflect_node(
             "artifact": state.get("artifact"),
         }
         result = await reflection_graph.ainvoke(reflection_state, config)
-        import sys
         print(f"Reflection completed successfully for assistant {assistant_id}", file=sys.stderr, flush=True)
     except Exception as e:
-        import sys
         print(f"Error during reflection: {e}", file=sys.stderr, flush=True)
         # Continue without failing the entire graph
         pass
     
-    return {}
+    return _EMPTY_RESULT
+
+
+def _char_total(state: OpenCanvasState, limit: Optional[int] = None) -> int:
+    """Get the character total of `_messages`, stopping early once it exceeds limit."""
+    total = 0
+    for msg in get_messages(state):
+        total += content_len(msg.content)
+        if limit is not None and total > limit:
+            break
+    return total
+
+
+def _has_single_user_message(messages: List[BaseMessage]) -> bool:
+    """Check if messages contain exactly one HumanMessage, stopping at the second."""
+    user_message_count = 0
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            user_message_count += 1
+            if user_message_count > 1:
+                return False
+    return user_message_count == 1
 
 
 async def clean_state_node(state: OpenCanvasState) -> Dict[str, Any]:
@@ -159,80 +226,19 @@ async def clean_state_node(state: OpenCanvasState) -> Dict[str, Any]:
     
     # Determine routing decision inline to avoid separate conditional function call
     messages = state.get("messages", [])
-    artifact = state.get("artifact")
-    
-    # Count user messages (HumanMessage) to detect first conversation
-    from langchain_core.messages import HumanMessage
-    user_message_count = sum(1 for msg in messages if isinstance(msg, HumanMessage))
     
-    # Determine next route based on same logic as conditionally_generate_title
-    # but do it here to avoid extra function call
-    if artifact and user_message_count == 1:
-        # First user message with artifact - generate title
-        cleaned_state["_next_route"] = "generateTitle"
-    elif len(messages) <= 4:
-        # First conversation - generate title
+    # Generate title if it's the first conversation (messages <= 4 to account for
+    # artifact + followup), or if an artifact exists and this is the first user message
+    if len(messages) <= 4 or (state.get("artifact") and _has_single_user_message(messages)):
         cleaned_state["_next_route"] = "generateTitle"
     else:
         # Check if summarization is needed
-        _messages = state.get("_messages", state.get("messages", []))
-        total_chars = sum(
-            len(msg.content) if isinstance(msg.content, str) else len(str(msg.content))
-            for msg in _messages
-        )
-        if total_chars > CHARACTER_MAX:
-            cleaned_state["_next_route"] = "summarizer"
-        else:
-            from langgraph.graph import END
-            cleaned_state["_next_route"] = END
+        total_chars = _char_total(state, CHARACTER_MAX)
+        cleaned_state["_next_route"] = "summarizer" if total_chars > CHARACTER_MAX else END
     
     return cleaned_state
 
 
-def simple_token_calculator(state: OpenCanvasState) -> Literal["summarizer", "END"]:
-    """Calculate if summarization is needed."""
-    messages = state.get("_messages", state.get("messages", []))
-    total_chars = sum(
-        len(msg.content) if isinstance(msg.content, str) else len(str(msg.content))
-        for msg in messages
-    )
-    if total_chars > CHARACTER_MAX:
-        return "summarizer"
-    from langgraph.graph import END
-    return END
-
-
-def conditionally_generate_title(state: OpenCanvasState) -> Literal["generateTitle", "summarizer", "END"]:
-    """Conditionally route to title generation.
-    
-    Generate title if:
-    1. It's the first conversation (messages <= 4, accounting for user message + artifact message + followup message), OR
-    2. An artifact exists and it's still early in the conversation (first user interaction)
-    
-    Otherwise, check if summarization is needed or go to END.
-    """
-    messages = state.get("messages", [])
-    artifact = state.get("artifact")
-    
-    # Count user messages (HumanMessage) to detect first conversation
-    # First conversation has exactly 1 user message
-    from langchain_core.messages import HumanMessage
-    user_message_count = sum(1 for msg in messages if isinstance(msg, HumanMessage))
-    
-    # If artifact exists and it's the first user message, always generate title
-    # This ensures title is generated when artifact is first created
-    if artifact and user_message_count == 1:
-        return "generateTitle"
-    
-    # If it's the first conversation (messages <= 4 to account for artifact + followup), generate title
-    # This covers cases without artifact too
-    if len(messages) <= 4:
-        return "generateTitle"
-    
-    # Otherwise, check if summarization is needed
-    return simple_token_calculator(state)
-
-
 async def generate_title_node(
     state: OpenCanvasState,
     config: RunnableConfig
@@ -249,13 +255,12 @@ async def generate_title_node(
     messages = state.get("messages", [])
     
     # Map thread_id to open_canvas_thread_id for thread_title graph
-    configurable = config.get("configurable", {}) if config else {}
-    thread_id = configurable.get("thread_id")
+    thread_id = get_config_view(state, config).thread_id
     
     # If thread_id is not available, skip title generation gracefully
     if not thread_id:
         # Return empty dict to continue without error (origin uses try-catch)
-        return {}
+        return _EMPTY_RESULT
     
     title_state = {
         "messages": messages,
@@ -264,7 +269,7 @@ async def generate_title_node(
     
     title_config = {
         "configurable": {
-            **configurable,
+            **config.get("configurable", {}),
             "open_canvas_thread_id": thread_id,
         }
     }
@@ -279,12 +284,44 @@ async def generate_title_node(
             return {"title": title}
     except Exception as e:
         # Log error but continue without failing (origin pattern)
-        import sys
         print(f"Failed to call generate title graph: {e}", file=sys.stderr, flush=True)
         # Return empty dict to continue without error
-        return {}
+        return _EMPTY_RESULT
+    
+    return _EMPTY_RESULT
+
+
+async def post_processing_fanout_node(
+    state: OpenCanvasState,
+    config: RunnableConfig
+) -> Dict[str, Any]:
+    """Run reflection and title generation concurrently.
     
-    return {}
+    Both only read the post-followup state, so their Bedrock calls can overlap.
+    Reflection runs when an assistant_id is set; title generation when cleanState
+    routed to it.
+    """
+    tasks = []
+    if get_config_view(state, config).assistant_id:
+        tasks.append(reflect_node(state, config))
+    if state.get("_next_route") == "generateTitle":
+        tasks.append(generate_title_node(state, config))
+    
+    if not tasks:
+        return _EMPTY_RESULT
+    
+    update: Dict[str, Any] = {}
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, BaseException):
+            print(f"Error during post-processing: {result}", file=sys.stderr, flush=True)
+            continue
+        update.update(result)
+    return update
+
+
+def route_after_post_processing(state: OpenCanvasState) -> Literal["summarizer", "__end__"]:
+    """Route to the summarizer if cleanState decided it's needed."""
+    return "summarizer" if state.get("_next_route") == "summarizer" else END
 
 
 async def summarizer_node(
@@ -292,9 +329,14 @@ async def summarizer_node(
     config: RunnableConfig
 ) -> Dict[str, Any]:
     """Summarize messages if too long."""
+    # The most recent turns stay verbatim, so only older messages are summarized
+    older_messages, _ = split_recent_messages(get_messages(state))
+    if not older_messages:
+        return _EMPTY_RESULT
+    
     summarizer_state = {
-        "messages": state.get("_messages", state.get("messages", [])),
-        "threadId": config.get("configurable", {}).get("thread_id", ""),
+        "messages": older_messages,
+        "threadId": get_config_view(state, config).thread_id or "",
     }
     result = await summarizer_graph.ainvoke(summarizer_state, config)
     return result
@@ -1,19 +1,24 @@
 """
 Routing nodes for Open Canvas graph.
 """
-from typing import Dict, Any, Literal
+from typing import Dict, Any
 from langchain_core.runnables import RunnableConfig
 from agents.open_canvas.state import OpenCanvasState
 from agents.open_canvas.generate_path import generate_path
 from core.utils import create_ai_message_from_web_results
+from core.config_view import build_config_view
 
 
 async def generate_path_node(
     state: OpenCanvasState,
     config: RunnableConfig
 ) -> Dict[str, Any]:
-    """Generate path/routing node with URL handling, document processing, and dynamic routing."""
-    return await generate_path(state, config)
+    """Generate path/routing node with URL handling, document processing, and dynamic routing.
+    
+    Also stashes the config view in state for the nodes that follow.
+    """
+    result = await generate_path(state, config)
+    return {**result, "_cfg": build_config_view(config)}
 
 
 async def route_node(state: OpenCanvasState) -> str:
@@ -24,17 +29,6 @@ async def route_node(state: OpenCanvasState) -> str:
     return next_node
 
 
-def route_after_followup(state: OpenCanvasState, config: RunnableConfig) -> Literal["reflect", "cleanState"]:
-    """Route after generateFollowup: skip reflection if no assistant_id."""
-    configurable = config.get("configurable", {}) if config else {}
-    assistant_id = configurable.get("open_canvas_assistant_id")
-    
-    # Skip reflection if no assistant_id (no assistants mode)
-    if not assistant_id:
-        return "cleanState"
-    return "reflect"
-
-
 async def route_post_web_search(state: OpenCanvasState) -> Dict[str, Any]:
     """Route after web search."""
     artifact = state.get("artifact")
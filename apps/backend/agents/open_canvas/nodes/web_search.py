@@ -12,6 +12,8 @@ async def web_search_node(
     config: RunnableConfig
 ) -> Dict[str, Any]:
     """Perform web search."""
+    # Subgraph inputs are built fresh per call rather than pooled: LangSmith
+    # tracing keeps a reference to them and serializes them after ainvoke returns
     web_search_state = {
         "messages": state.get("messages", []),
         "query": None,
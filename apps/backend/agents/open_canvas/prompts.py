@@ -1,6 +1,32 @@
 """
 Prompts for Open Canvas agent.
 """
+from string import Formatter
+from typing import Callable
+
+
+def _compile(template: str, *fields: str) -> Callable[..., str]:
+    """Parse a ``str.format`` template once and return a render function.
+    
+    The returned callable takes the template fields as keyword arguments and
+    produces the same output as ``template.format(**kwargs)`` without
+    re-parsing the template on every call.
+    """
+    parsed = [
+        (literal, name)
+        for literal, name, _format_spec, _conversion in Formatter().parse(template)
+    ]
+    unknown = {name for _, name in parsed if name is not None} - set(fields)
+    if unknown:
+        raise ValueError(f"Template references undeclared fields: {sorted(unknown)}")
+    
+    def render(**kwargs: object) -> str:
+        return "".join([
+            literal + str(kwargs[name]) if name is not None else literal
+            for literal, name in parsed
+        ])
+    
+    return render
 
 
 APP_CONTEXT = """
@@ -313,3 +339,24 @@ CUSTOM_ACTION_REFLECTIONS_PROMPT = """You also have the following reflections on
 CUSTOM_ACTION_PREFIX_PROMPT = """You are an AI assistant. The user has provided custom instructions for you to follow.
 {custom_instructions}"""
 
+
+# Precompiled renderers for prompts formatted on every request
+GENERATE_ARTIFACT_PROMPT_FN = _compile(GENERATE_ARTIFACT_PROMPT, "reflections", "conversation")
+CHANGE_ARTIFACT_LANGUAGE_PROMPT_FN = _compile(
+    CHANGE_ARTIFACT_LANGUAGE_PROMPT, "newLanguage", "artifactContent", "reflections"
+)
+CHANGE_ARTIFACT_READING_LEVEL_PROMPT_FN = _compile(
+    CHANGE_ARTIFACT_READING_LEVEL_PROMPT, "newReadingLevel", "artifactContent", "reflections"
+)
+CHANGE_ARTIFACT_TO_PIRATE_PROMPT_FN = _compile(
+    CHANGE_ARTIFACT_TO_PIRATE_PROMPT, "artifactContent", "reflections"
+)
+CHANGE_ARTIFACT_LENGTH_PROMPT_FN = _compile(
+    CHANGE_ARTIFACT_LENGTH_PROMPT, "newLength", "artifactContent", "reflections"
+)
+ADD_EMOJIS_TO_ARTIFACT_PROMPT_FN = _compile(
+    ADD_EMOJIS_TO_ARTIFACT_PROMPT, "artifactContent", "reflections"
+)
+FOLLOWUP_ARTIFACT_PROMPT_FN = _compile(
+    FOLLOWUP_ARTIFACT_PROMPT, "artifactContent", "reflections", "conversation"
+)
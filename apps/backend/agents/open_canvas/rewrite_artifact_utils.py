@@ -4,7 +4,8 @@ Utility functions for rewrite-artifact node.
 from typing import Dict, Any, Optional
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
-from agents.open_canvas.state import OpenCanvasState
+from agents.open_canvas.state import OpenCanvasState, get_recent_human_message, get_messages
+from core.config_view import get_config_view
 from core.bedrock_client import get_bedrock_model
 from core.utils import (
     get_artifact_content, is_artifact_markdown_content,
@@ -59,12 +60,8 @@ async def optionally_update_artifact_meta(
     )
     
     # Get recent human message
-    messages = state.get("_messages", state.get("messages", []))
-    recent_human_message = None
-    for msg in reversed(messages):
-        if isinstance(msg, HumanMessage):
-            recent_human_message = msg
-            break
+    messages = get_messages(state)
+    recent_human_message = get_recent_human_message(state, messages)
     
     if not recent_human_message:
         raise ValueError("No recent human message found")
@@ -173,15 +170,14 @@ def create_new_artifact_content(
     
     # Get the actual maximum version index from storage, not from state
     # because state may only contain the latest version
-    configurable = config.get("configurable", {}) if config else {}
-    thread_id = configurable.get("thread_id")
+    thread_id = get_config_view(state, config).thread_id
     
     if thread_id:
         try:
             metadata = thread_store.get_artifact_metadata(thread_id)
             if metadata and metadata.get("version_indices"):
-                # Get the maximum version index from metadata
-                max_index = max(metadata["version_indices"])
+                # current_index is the highest stored version index
+                max_index = metadata["current_index"]
                 new_index = max_index + 1
             else:
                 # Fallback to len(contents) + 1 if metadata not available
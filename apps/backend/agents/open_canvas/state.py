@@ -1,10 +1,13 @@
 """
 State definition for Open Canvas graph.
 """
-from typing import TypedDict, List, Optional, Any, Annotated
-from langchain_core.messages import BaseMessage
+from typing import TypedDict, List, Optional, Any, Annotated, Sequence
+from langchain_core.messages import BaseMessage, HumanMessage
 from langgraph.graph.message import add_messages
 
+# Shared fallback for states without messages; never mutated
+_EMPTY: List[BaseMessage] = []
+
 
 class OpenCanvasState(TypedDict):
     """State for Open Canvas graph."""
@@ -21,4 +24,43 @@ class OpenCanvasState(TypedDict):
     webSearchEnabled: Optional[bool]
     webSearchResults: Optional[List[dict]]
     title: Optional[str]
+    # Index of the most recent HumanMessage in `_messages`, set when messages are added
+    lastHumanIndex: Optional[int]
+    # Route chosen by cleanState (generateTitle, summarizer or END)
+    _next_route: Optional[str]
+    # core.config_view.OpenCanvasConfig, set at graph entry
+    _cfg: Optional[Any]
+
+
+def get_messages(state: OpenCanvasState) -> List[BaseMessage]:
+    """Get the internal message list, falling back to the user-facing one."""
+    messages = state.get("_messages")
+    if messages is not None:
+        return messages
+    return state.get("messages") or _EMPTY
+
+
+def find_last_human_index(messages: Sequence[BaseMessage]) -> Optional[int]:
+    """Find the index of the most recent HumanMessage, or None if there is none."""
+    for idx in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[idx], HumanMessage):
+            return idx
+    return None
+
 
+def get_recent_human_message(
+    state: OpenCanvasState,
+    messages: Sequence[BaseMessage]
+) -> Optional[HumanMessage]:
+    """Get the most recent HumanMessage using the tracked index.
+    
+    Falls back to a linear scan if the index is missing or stale.
+    """
+    idx = state.get("lastHumanIndex")
+    if idx is not None and 0 <= idx < len(messages):
+        msg = messages[idx]
+        if isinstance(msg, HumanMessage):
+            return msg
+    
+    idx = find_last_human_index(messages)
+    return messages[idx] if idx is not None else None
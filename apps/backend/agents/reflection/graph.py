@@ -8,9 +8,9 @@ from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START
 from agents.reflection.state import ReflectionGraphState
 from agents.reflection.prompts import REFLECT_SYSTEM_PROMPT, REFLECT_USER_PROMPT
-from core.utils import format_reflections
-from core.bedrock_client import get_bedrock_model
-from store.store import store
+from core.utils import format_reflections, NO_REFLECTIONS
+from core.bedrock_client import get_bedrock_model, bind_forced_tool
+import store.store as store_module
 
 
 @tool
@@ -41,12 +41,12 @@ async def reflect_node(
     # Get existing reflections from store
     namespace = ["memories", assistant_id]
     key = "reflection"
-    store_item = store.get_item(namespace, key)
+    store_item = store_module.store.get_item(namespace, key)
     existing_reflections = {}
     if store_item and store_item.get("value"):
         existing_reflections = store_item["value"]
     
-    memories_as_string = format_reflections(existing_reflections) if existing_reflections else "No reflections found."
+    memories_as_string = format_reflections(existing_reflections) if existing_reflections else NO_REFLECTIONS
     
     # Get artifact content
     artifact = state.get("artifact")
@@ -71,7 +71,7 @@ async def reflect_node(
     
     # Get model
     model = get_bedrock_model(config, temperature=0)
-    model_with_tools = model.bind_tools([generate_reflections], tool_choice="generate_reflections")
+    model_with_tools = bind_forced_tool(model, generate_reflections)
     
     # Format prompts
     formatted_system_prompt = REFLECT_SYSTEM_PROMPT.replace(
@@ -104,7 +104,7 @@ async def reflect_node(
     # Store new memories to store
     namespace = ["memories", assistant_id]
     key = "reflection"
-    store.put_item(namespace, key, new_memories)
+    store_module.store.put_item(namespace, key, new_memories)
     
     return {
         "reflections": new_memories
@@ -1,14 +1,14 @@
 """
 Thread title generation graph.
 """
-from typing import Dict, Any
-from langchain_core.messages import SystemMessage, HumanMessage
+from typing import Dict, Any, List
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
 from langchain_core.tools import tool
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START
 from agents.thread_title.state import TitleGenerationState
-from agents.thread_title.prompts import TITLE_SYSTEM_PROMPT, TITLE_USER_PROMPT
-from core.bedrock_client import get_bedrock_model
+from agents.thread_title.prompts import TITLE_SYSTEM_PROMPT, render_title_user_prompt
+from core.bedrock_client import get_bedrock_model, bind_forced_tool
 
 
 @tool
@@ -24,6 +24,19 @@ def generate_title(title: str) -> Dict[str, Any]:
     return {"title": title}
 
 
+def _format_conversation(messages: List[BaseMessage]) -> str:
+    """Format messages as <ClassName>-tagged blocks, skipping empty ones."""
+    parts = []
+    for msg in messages:
+        content = msg.content
+        if not content:
+            continue
+        name = type(msg).__name__
+        parts.append(f"<{name}>\n{content}\n</{name}>")
+    # join() on a list avoids the copy it makes when given a generator
+    return "\n\n".join(parts)
+
+
 async def generate_title_node(
     state: TitleGenerationState,
     config: RunnableConfig
@@ -56,20 +69,14 @@ async def generate_title_node(
     
     # Format messages
     messages = state.get("messages", [])
-    conversation = "\n\n".join([
-        f"<{msg.__class__.__name__}>\n{msg.content}\n</{msg.__class__.__name__}>"
-        for msg in messages
-    ])
+    conversation = _format_conversation(messages)
     
     # Get model
     model = get_bedrock_model(config, temperature=0)
-    model_with_tools = model.bind_tools([generate_title], tool_choice="generate_title")
+    model_with_tools = bind_forced_tool(model, generate_title)
     
     # Format prompts
-    formatted_user_prompt = TITLE_USER_PROMPT.replace(
-        "{conversation}",
-        conversation
-    ).replace("{artifact_context}", artifact_context)
+    formatted_user_prompt = render_title_user_prompt(conversation, artifact_context)
     
     # Invoke model
     result = await model_with_tools.ainvoke([
@@ -20,3 +20,12 @@ TITLE_USER_PROMPT = """Based on the following conversation, generate a very shor
 
 {artifact_context}"""
 
+
+# TITLE_USER_PROMPT split around its two fields, so rendering is plain concatenation
+_TITLE_USER_HEAD, _, _rest = TITLE_USER_PROMPT.partition("{conversation}")
+_TITLE_USER_MIDDLE, _, _TITLE_USER_TAIL = _rest.partition("{artifact_context}")
+
+
+def render_title_user_prompt(conversation: str, artifact_context: str) -> str:
+    """Fill TITLE_USER_PROMPT with the conversation and artifact context."""
+    return _TITLE_USER_HEAD + conversation + _TITLE_USER_MIDDLE + artifact_context + _TITLE_USER_TAIL
@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from typing import List, Dict, Any, Optional, AsyncIterator
 import json
 from agents.open_canvas.graph import graph
+from agents.open_canvas.state import find_last_human_index
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from core.utils import extract_latest_artifact_version
 
@@ -114,8 +115,8 @@ def format_event_log(event_type: str, event_name: str, event: Dict[str, Any]) ->
         data = event.get("data", {})
         output = data.get("output")
         if output:
-            # For generateTitle node, show title explicitly
-            if event_name == "generateTitle" and isinstance(output, dict):
+            # For postProcessing node, show title explicitly
+            if event_name == "postProcessing" and isinstance(output, dict):
                 title = output.get("title")
                 if title:
                     return f"{base_info} | output: {{'title': '{title}'}}"
@@ -201,6 +202,7 @@ def prepare_state(request: OpenCanvasRequest) -> Dict[str, Any]:
         "customQuickActionId": request.customQuickActionId,
         "webSearchEnabled": request.webSearchEnabled,
         "webSearchResults": request.webSearchResults,
+        "lastHumanIndex": find_last_human_index(langchain_messages),
     }
     
     # Log the state values that will be used for routing
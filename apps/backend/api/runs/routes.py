@@ -2,6 +2,7 @@
 FastAPI routes for LangSmith runs management (feedback and sharing).
 """
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from api.runs.models import (
     FeedbackRequest,
     FeedbackResponse,
@@ -21,22 +22,23 @@ router = APIRouter()
 @router.post("/feedback", response_model=FeedbackResponse)
 async def create_feedback_endpoint(request: FeedbackRequest):
     """Create feedback for a LangSmith run."""
-    feedback_dict = create_feedback(
+    feedback_dict = await create_feedback(
         run_id=request.runId,
         feedback_key=request.feedbackKey,
         score=request.score,
         comment=request.comment
     )
-    return FeedbackResponse(
-        success=True,
-        feedback=feedback_dict
-    )
+    # Returning a Response skips response_model validation; the model still documents it
+    return ORJSONResponse(content={
+        "success": True,
+        "feedback": feedback_dict
+    })
 
 
 @router.get("/feedback")
 async def get_feedback_endpoint(runId: str, feedbackKey: str):
     """Get feedback for a LangSmith run."""
-    feedback_list = get_feedback(runId, feedbackKey)
+    feedback_list = await get_feedback(runId, feedbackKey)
     return {
         "feedback": feedback_list
     }
@@ -46,4 +48,4 @@ async def get_feedback_endpoint(runId: str, feedbackKey: str):
 async def share_run_endpoint(request: ShareRunRequest):
     """Share a LangSmith run and get a public URL."""
     shared_run_url = await share_run(request.runId)
-    return ShareRunResponse(sharedRunURL=shared_run_url)
+    return ORJSONResponse(content={"sharedRunURL": shared_run_url})
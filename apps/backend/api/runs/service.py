@@ -1,92 +1,137 @@
 """
 Business logic for LangSmith runs management (feedback and sharing).
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from functools import lru_cache
 from langsmith import Client
-from langsmith.schemas import Feedback
+from langsmith.utils import LangSmithError
+import asyncio
+import httpx
 import os
-import time
+import random
+import uuid
 
 MAX_RETRIES = 5
-RETRY_DELAY = 5  # seconds
+RETRY_DELAY = 5  # seconds, before the first retry
+MAX_RETRY_DELAY = 30  # seconds
 
+DEFAULT_LANGSMITH_ENDPOINT = "https://api.smith.langchain.com"
+HTTP_TIMEOUT = 30  # seconds
+FEEDBACK_PAGE_SIZE = 100
 
-def get_langsmith_client() -> Client:
-    """Get LangSmith client instance."""
+# Created on first use, closed on app shutdown
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_langsmith_api_key() -> str:
+    """Get the LangSmith API key from the environment."""
     from core.exceptions import InternalServerError
     api_key = os.getenv("LANGCHAIN_API_KEY")
     if not api_key:
         raise InternalServerError("LANGCHAIN_API_KEY environment variable is not set")
+    return api_key
+
+
+def get_langsmith_client() -> Client:
+    """Get LangSmith client instance, shared while the API key is unchanged."""
+    return _create_langsmith_client(_get_langsmith_api_key())
+
+
+@lru_cache(maxsize=1)
+def _create_langsmith_client(api_key: str) -> Client:
+    """Create a LangSmith client, cached by API key to reuse its connection pool."""
     return Client(api_key=api_key)
 
 
-def create_feedback(
+def get_langsmith_http_client() -> httpx.AsyncClient:
+    """Get the shared async client for the LangSmith REST API.
+    
+    The API key isn't baked into the client; requests pass it through
+    _langsmith_auth_headers so a changed LANGCHAIN_API_KEY takes effect.
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            base_url=os.getenv("LANGSMITH_ENDPOINT") or DEFAULT_LANGSMITH_ENDPOINT,
+            timeout=HTTP_TIMEOUT,
+        )
+    return _http_client
+
+
+def _langsmith_auth_headers() -> Dict[str, str]:
+    """Build the auth header for a LangSmith REST request from the current API key."""
+    return {"x-api-key": _get_langsmith_api_key()}
+
+
+async def close_langsmith_http_client() -> None:
+    """Close the shared LangSmith HTTP client, if it was opened."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def create_feedback(
     run_id: str,
     feedback_key: str,
     score: float,
     comment: str = None
 ) -> Dict[str, Any]:
     """Create feedback for a LangSmith run."""
-    ls_client = get_langsmith_client()
-    
-    # LangSmith Client.create_feedback is synchronous
-    feedback = ls_client.create_feedback(
-        run_id,
-        feedback_key,
-        score=score,
-        comment=comment
-    )
-    
-    # Convert feedback to dict
-    if hasattr(feedback, 'dict'):
-        feedback_dict = feedback.dict()
-    elif hasattr(feedback, 'model_dump'):
-        feedback_dict = feedback.model_dump()
-    else:
-        feedback_dict = dict(feedback) if hasattr(feedback, '__dict__') else str(feedback)
-    
-    return feedback_dict
+    client = get_langsmith_http_client()
+    response = await client.post("/feedback", headers=_langsmith_auth_headers(), json={
+        "id": str(uuid.uuid4()),
+        "run_id": run_id,
+        "key": feedback_key,
+        "score": score,
+        "comment": comment,
+        "feedback_source": {"type": "api"},
+    })
+    response.raise_for_status()
+    return response.json()
 
 
-def get_feedback(run_id: str, feedback_key: str) -> List[Dict[str, Any]]:
+async def get_feedback(run_id: str, feedback_key: str) -> List[Dict[str, Any]]:
     """Get feedback for a LangSmith run."""
-    ls_client = get_langsmith_client()
-    
-    # LangSmith Client.list_feedback returns an iterator
-    run_feedback: List[Feedback] = []
-    for feedback in ls_client.list_feedback(
-        run_ids=[run_id],
-        feedback_key=[feedback_key]
-    ):
-        run_feedback.append(feedback)
+    client = get_langsmith_http_client()
+    headers = _langsmith_auth_headers()
     
-    # Convert feedback objects to dicts
-    feedback_list = []
-    for fb in run_feedback:
-        if hasattr(fb, 'dict'):
-            feedback_list.append(fb.dict())
-        elif hasattr(fb, 'model_dump'):
-            feedback_list.append(fb.model_dump())
-        elif hasattr(fb, '__dict__'):
-            feedback_list.append(dict(fb))
-        else:
-            feedback_list.append(str(fb))
-    
-    return feedback_list
+    # The feedback endpoint is paginated; read pages until a short one
+    feedback_list: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        response = await client.get("/feedback", headers=headers, params={
+            "run": run_id,
+            "key": feedback_key,
+            "limit": FEEDBACK_PAGE_SIZE,
+            "offset": offset,
+        })
+        response.raise_for_status()
+        page = response.json()
+        feedback_list.extend(page)
+        if len(page) < FEEDBACK_PAGE_SIZE:
+            return feedback_list
+        offset += FEEDBACK_PAGE_SIZE
 
 
-def share_run_with_retry(ls_client: Client, run_id: str) -> str:
-    """Share a run with retry logic."""
+async def share_run_with_retry(ls_client: Client, run_id: str) -> str:
+    """Share a run with retry logic.
+    
+    Each attempt runs in the threadpool; the wait between attempts is an
+    asyncio sleep so it doesn't hold a threadpool worker.
+    """
     for attempt in range(1, MAX_RETRIES + 1):
         try:
             # LangSmith Client.share_run is synchronous
-            shared_url = ls_client.share_run(run_id)
-            return shared_url
-        except Exception as e:
+            return await run_in_threadpool(ls_client.share_run, run_id)
+        except (LangSmithError, ConnectionError, TimeoutError) as e:
             if attempt == MAX_RETRIES:
                 raise e
-            print(f"Attempt {attempt} failed. Retrying in {RETRY_DELAY} seconds...")
-            time.sleep(RETRY_DELAY)
+            # Truncated exponential backoff with jitter, so concurrent retries spread out
+            delay = min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** (attempt - 1)) * (0.5 + random.random() * 0.5)
+            print(f"Attempt {attempt} failed. Retrying in {delay:.1f} seconds...")
+            await asyncio.sleep(delay)
     
     raise Exception("Max retries reached")
 
@@ -94,14 +139,4 @@ def share_run_with_retry(ls_client: Client, run_id: str) -> str:
 async def share_run(run_id: str) -> str:
     """Share a LangSmith run and get a public URL."""
     ls_client = get_langsmith_client()
-    # Run synchronous function in thread pool to avoid blocking
-    import asyncio
-    loop = asyncio.get_event_loop()
-    shared_run_url = await loop.run_in_executor(
-        None, 
-        share_run_with_retry, 
-        ls_client, 
-        run_id
-    )
-    return shared_run_url
-
+    return await share_run_with_retry(ls_client, run_id)
@@ -2,7 +2,7 @@
 FastAPI routes for store management.
 Implements LangGraph SDK compatible store endpoints.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from fastapi.exceptions import HTTPException
 from api.store.models import (
     StoreGetRequest,
@@ -15,6 +15,7 @@ from api.store.service import (
     delete_store_item,
 )
 from core.exceptions import NotFoundError
+from core.request_body import json_body, json_body_openapi
 
 router = APIRouter()
 
@@ -22,23 +23,23 @@ router = APIRouter()
 @router.post("/get")
 async def get_store_item_endpoint(request: StoreGetRequest):
     """Get an item from the store."""
-    item = get_store_item(request.namespace, request.key)
+    item = await get_store_item(request.namespace, request.key)
     if item is None:
         return {"item": None}
     return {"item": item}
 
 
-@router.post("/put")
-async def put_store_item_endpoint(request: StorePutRequest):
+@router.post("/put", openapi_extra=json_body_openapi(StorePutRequest))
+async def put_store_item_endpoint(request: StorePutRequest = Depends(json_body(StorePutRequest))):
     """Put an item into the store."""
-    put_store_item(request.namespace, request.key, request.value)
+    await put_store_item(request.namespace, request.key, request.value)
     return {"success": True}
 
 
 @router.post("/delete")
 async def delete_store_item_endpoint(request: StoreDeleteRequest):
     """Delete an item from the store."""
-    deleted = delete_store_item(request.namespace, request.key)
+    deleted = await delete_store_item(request.namespace, request.key)
     if not deleted:
         raise NotFoundError("Store item", f"{request.namespace}/{request.key}")
     return {"success": True}
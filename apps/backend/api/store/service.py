@@ -1,21 +1,24 @@
 """
 Business logic for store management.
+
+Store backends may do network I/O (DynamoDB), so calls run in the threadpool
+instead of blocking the event loop.
 """
 from typing import Dict, Any, List, Optional
-from store.store import store
+from fastapi.concurrency import run_in_threadpool
+import store.store as store_module
 
 
-def get_store_item(namespace: List[str], key: str) -> Optional[Dict[str, Any]]:
+async def get_store_item(namespace: List[str], key: str) -> Optional[Dict[str, Any]]:
     """Get an item from the store."""
-    return store.get_item(namespace, key)
+    return await run_in_threadpool(store_module.store.get_item, namespace, key)
 
 
-def put_store_item(namespace: List[str], key: str, value: Any) -> None:
+async def put_store_item(namespace: List[str], key: str, value: Any) -> None:
     """Put an item into the store."""
-    store.put_item(namespace, key, value)
+    await run_in_threadpool(store_module.store.put_item, namespace, key, value)
 
 
-def delete_store_item(namespace: List[str], key: str) -> bool:
+async def delete_store_item(namespace: List[str], key: str) -> bool:
     """Delete an item from the store."""
-    return store.delete_item(namespace, key)
-
+    return await run_in_threadpool(store_module.store.delete_item, namespace, key)
@@ -2,12 +2,14 @@
 Request/Response models for summarizer agent API.
 """
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional
 
 
 class SummarizerRequest(BaseModel):
     """Request model for summarizer."""
-    messages: List[Dict[str, Any]]
+    # Message dicts as sent by the SDK; only the list itself is validated, the graph
+    # coerces each message
+    messages: list
     threadId: str
     config: Optional[Dict[str, Any]] = None
 
@@ -1,15 +1,16 @@
 """
 FastAPI routes for summarizer agent.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from api.summarizer.models import SummarizerRequest
 from api.summarizer.service import summarize
+from core.request_body import json_body, json_body_openapi
 
 router = APIRouter()
 
 
-@router.post("/summarize")
-async def summarize_endpoint(request: SummarizerRequest):
+@router.post("/summarize", openapi_extra=json_body_openapi(SummarizerRequest))
+async def summarize_endpoint(request: SummarizerRequest = Depends(json_body(SummarizerRequest))):
     """Summarize conversation messages."""
     result = await summarize(
         messages=request.messages,
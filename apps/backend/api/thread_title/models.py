@@ -2,12 +2,14 @@
 Request/Response models for thread title agent API.
 """
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional
 
 
 class ThreadTitleRequest(BaseModel):
     """Request model for thread title generation."""
-    messages: List[Dict[str, Any]]
+    # Message dicts as sent by the SDK; only the list itself is validated, the graph
+    # coerces each message
+    messages: list
     artifact: Optional[Dict[str, Any]] = None
     config: Optional[Dict[str, Any]] = None
 
@@ -1,15 +1,16 @@
 """
 FastAPI routes for thread title agent.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from api.thread_title.models import ThreadTitleRequest
 from api.thread_title.service import generate_title
+from core.request_body import json_body, json_body_openapi
 
 router = APIRouter()
 
 
-@router.post("/generate")
-async def generate_title_endpoint(request: ThreadTitleRequest):
+@router.post("/generate", openapi_extra=json_body_openapi(ThreadTitleRequest))
+async def generate_title_endpoint(request: ThreadTitleRequest = Depends(json_body(ThreadTitleRequest))):
     """Generate title for conversation."""
     result = await generate_title(
         messages=request.messages,
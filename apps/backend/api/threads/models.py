@@ -18,6 +18,7 @@ class ThreadSearchRequest(BaseModel):
 
 class ThreadUpdateRequest(BaseModel):
     """Request model for thread update."""
-    values: Optional[Dict[str, Any]] = None
+    # May carry the full artifact; kept as a plain dict rather than walked per key
+    values: Optional[dict] = None
     metadata: Optional[Dict[str, Any]] = None
 
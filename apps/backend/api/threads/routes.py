@@ -3,8 +3,9 @@ FastAPI routes for thread management.
 Implements LangGraph SDK compatible thread endpoints.
 """
 from typing import Optional
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from fastapi.exceptions import HTTPException
+from fastapi.responses import ORJSONResponse
 from api.threads.models import (
     ThreadCreateRequest,
     ThreadSearchRequest,
@@ -17,9 +18,10 @@ from api.threads.service import (
     delete_thread,
     update_thread_state,
     get_artifact_metadata,
-    get_artifact_version,
+    get_artifact_version_or_available,
 )
 from core.exceptions import NotFoundError
+from core.request_body import json_body, json_body_openapi
 
 router = APIRouter()
 
@@ -57,8 +59,11 @@ async def delete_thread_endpoint(thread_id: str):
     return {"status": "deleted", "thread_id": thread_id}
 
 
-@router.post("/{thread_id}/state")
-async def update_thread_state_endpoint(thread_id: str, request: ThreadUpdateRequest):
+@router.post("/{thread_id}/state", openapi_extra=json_body_openapi(ThreadUpdateRequest))
+async def update_thread_state_endpoint(
+    thread_id: str,
+    request: ThreadUpdateRequest = Depends(json_body(ThreadUpdateRequest))
+):
     """Update thread state (values and/or metadata).
     
     This endpoint is compatible with LangGraph SDK's updateState method.
@@ -85,30 +90,19 @@ async def get_artifact_endpoint(thread_id: str, version: Optional[int] = None):
         Artifact dict with the specified version, or latest if version is not provided.
     """
     if version is not None:
-        # Validate version exists before fetching
-        metadata = get_artifact_metadata(thread_id)
-        if metadata is None:
-            raise NotFoundError("Artifact", f"for thread {thread_id}")
-        
-        # Check if requested version exists
-        version_indices = metadata.get("version_indices", [])
-        if version not in version_indices:
+        # Fetch the version directly; available versions are only read on a miss
+        artifact, available = get_artifact_version_or_available(thread_id, version)
+        if artifact is None:
+            if available is None:
+                raise NotFoundError("Artifact", f"for thread {thread_id}")
             # Provide helpful error message with available versions
-            available_versions = ", ".join(map(str, version_indices)) if version_indices else "none"
+            available_versions = ", ".join(map(str, available)) if available else "none"
             raise NotFoundError(
                 "Artifact version",
                 f"{version} for thread {thread_id}. Available versions: {available_versions}"
             )
-        
-        # Get specific version
-        artifact = get_artifact_version(thread_id, version)
-        if artifact is None:
-            # This shouldn't happen if metadata is correct, but handle it gracefully
-            raise NotFoundError(
-                "Artifact version",
-                f"{version} for thread {thread_id}"
-            )
-        return artifact
+        # Artifacts are stored as JSON, so they can skip jsonable_encoder
+        return ORJSONResponse(content=artifact)
     else:
         # Get latest version
         thread = get_thread(thread_id)
@@ -117,7 +111,7 @@ async def get_artifact_endpoint(thread_id: str, version: Optional[int] = None):
         artifact = thread.get("values", {}).get("artifact")
         if artifact is None:
             raise NotFoundError("Artifact", f"for thread {thread_id}")
-        return artifact
+        return ORJSONResponse(content=artifact)
 
 
 @router.get("/{thread_id}/artifact/versions")
@@ -1,9 +1,16 @@
 """
 Business logic for thread management.
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+import time
 from api.threads.store import thread_store
 
+# Artifact metadata is polled while the UI browses versions; cache it briefly.
+# Entries are dropped on any write through this module.
+_ARTIFACT_METADATA_TTL = 5.0  # seconds
+_ARTIFACT_METADATA_CACHE_SIZE = 1024
+_artifact_metadata_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
 
 def create_thread(metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Create a new thread."""
@@ -17,26 +24,12 @@ def get_thread(thread_id: str) -> Optional[Dict[str, Any]]:
 
 def search_threads(limit: int = 100, filter_dict: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """Search threads with optional filtering."""
-    threads = thread_store.search(limit=limit)
-    
-    # Apply filter if provided
-    if filter_dict:
-        filtered_threads = []
-        for thread in threads:
-            match = True
-            for key, value in filter_dict.items():
-                if key in thread.get("metadata", {}) and thread["metadata"][key] != value:
-                    match = False
-                    break
-            if match:
-                filtered_threads.append(thread)
-        threads = filtered_threads
-    
-    return threads
+    return thread_store.search(limit=limit, filter_dict=filter_dict)
 
 
 def delete_thread(thread_id: str) -> bool:
     """Delete a thread."""
+    _artifact_metadata_cache.pop(thread_id, None)
     return thread_store.delete(thread_id)
 
 
@@ -45,36 +38,55 @@ def update_thread_state(
     values: Optional[Dict[str, Any]] = None,
     metadata: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict[str, Any]]:
-    """Update thread state (values and/or metadata)."""
-    thread = thread_store.get(thread_id)
-    if not thread:
+    """Update thread state (values and/or metadata).
+    
+    Only the given fields are written: the store replaces messages and/or
+    artifact if present in values, and merges metadata into the existing
+    metadata, so the current thread doesn't need to be loaded and copied.
+    """
+    if not thread_store.exists(thread_id):
         return None
     
     # Prepare updates dictionary
     updates = {}
-    
-    # Update values if provided - merge with existing values
     if values is not None:
-        existing_values = thread.get("values", {})
-        merged_values = {**existing_values, **values}
-        updates["values"] = merged_values
-    
-    # Update metadata if provided - merge with existing metadata
+        updates["values"] = values
     if metadata is not None:
-        existing_metadata = thread.get("metadata", {})
-        merged_metadata = {**existing_metadata, **metadata}
-        updates["metadata"] = merged_metadata
+        updates["metadata"] = metadata
     
     # Update the thread in store
+    _artifact_metadata_cache.pop(thread_id, None)
     return thread_store.update(thread_id, updates)
 
 
-def get_artifact_metadata(thread_id: str) -> Optional[Dict[str, Any]]:
-    """Get artifact version metadata."""
-    return thread_store.get_artifact_metadata(thread_id)
+def _copy_artifact_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy artifact metadata, including its version list."""
+    return {**metadata, "version_indices": list(metadata.get("version_indices") or [])}
+
 
+def get_artifact_metadata(thread_id: str) -> Optional[Dict[str, Any]]:
+    """Get artifact version metadata, cached for a few seconds.
+    
+    Callers get their own copy, so the cached entry can't be changed through it.
+    """
+    now = time.monotonic()
+    cached = _artifact_metadata_cache.get(thread_id)
+    if cached is not None and cached[0] > now:
+        return _copy_artifact_metadata(cached[1])
+    
+    metadata = thread_store.get_artifact_metadata(thread_id)
+    # Misses aren't cached, so a thread's first artifact shows up immediately
+    if metadata is not None:
+        if len(_artifact_metadata_cache) >= _ARTIFACT_METADATA_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            _artifact_metadata_cache.pop(next(iter(_artifact_metadata_cache)))
+        _artifact_metadata_cache[thread_id] = (now + _ARTIFACT_METADATA_TTL, metadata)
+        return _copy_artifact_metadata(metadata)
+    return None
 
-def get_artifact_version(thread_id: str, version_index: int) -> Optional[Dict[str, Any]]:
-    """Get a specific artifact version for a thread."""
-    return thread_store.get_artifact_version(thread_id, version_index)
 
+def get_artifact_version_or_available(
+    thread_id: str, version_index: int
+) -> Tuple[Optional[Dict[str, Any]], Optional[List[int]]]:
+    """Get a specific artifact version, or the available versions if it's missing."""
+    return thread_store.get_artifact_version_or_available(thread_id, version_index)
@@ -3,7 +3,7 @@ Thread store with normalized storage backends.
 Supports memory and DynamoDB via environment configuration.
 Uses normalized structure: threads, messages, and artifacts are stored separately.
 """
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime
 import uuid
 from store.factory import create_thread_storage
@@ -56,10 +56,31 @@ class ThreadStore:
             "updated_at": thread.get("updated_at"),
         }
     
+    def exists(self, thread_id: str) -> bool:
+        """Check whether a thread exists without loading its messages or artifact."""
+        return self._storage.get_thread(thread_id) is not None
+    
     def get_artifact_version(self, thread_id: str, version_index: int) -> Optional[Dict]:
         """Get a specific artifact version for a thread."""
         return self._storage.get_thread_artifact_version(thread_id, version_index)
     
+    def get_artifact_version_or_available(
+        self, thread_id: str, version_index: int
+    ) -> Tuple[Optional[Dict], Optional[List[int]]]:
+        """Get a specific artifact version, or the available versions if it's missing.
+        
+        Returns (artifact, None) on a hit. On a miss, returns (None, version_indices),
+        with version_indices None if the thread has no artifact at all. The
+        metadata is only read on a miss.
+        """
+        artifact = self._storage.get_thread_artifact_version(thread_id, version_index)
+        if artifact is not None:
+            return artifact, None
+        metadata = self._storage.get_thread_artifact_metadata(thread_id)
+        if metadata is None:
+            return None, None
+        return None, metadata.get("version_indices", [])
+    
     def get_artifact_metadata(self, thread_id: str) -> Optional[Dict]:
         """Get artifact metadata (version list, current_index, etc.) without full content."""
         return self._storage.get_thread_artifact_metadata(thread_id)
@@ -97,15 +118,18 @@ class ThreadStore:
         """Delete a thread and all associated data."""
         return self._storage.delete_thread(thread_id)
     
-    def search(self, limit: int = 100) -> List[Dict]:
-        """Search threads (returns all threads sorted by updated_at descending).
+    def search(self, limit: int = 100, filter_dict: Optional[Dict] = None) -> List[Dict]:
+        """Search threads (returns threads sorted by updated_at descending).
+        
+        Threads whose metadata has a different value for a filter key are excluded;
+        threads without the key are kept.
         
         Includes first message for each thread to enable title display in UI.
         Use get() to retrieve full thread with all messages and artifact.
         
         Optimized to avoid N+1 queries by including first_message in search_threads result.
         """
-        threads = self._storage.search_threads(limit)
+        threads = self._storage.search_threads(limit, filter_dict)
         # Convert to LangGraph SDK compatible format
         result = []
         for t in threads:
@@ -2,11 +2,13 @@
 Request/Response models for web search agent API.
 """
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional
 
 
 class WebSearchRequest(BaseModel):
     """Request model for web search."""
-    messages: List[Dict[str, Any]]
+    # Message dicts as sent by the SDK; only the list itself is validated, the graph
+    # coerces each message
+    messages: list
     config: Optional[Dict[str, Any]] = None
 
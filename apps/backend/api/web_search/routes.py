@@ -1,15 +1,16 @@
 """
 FastAPI routes for web search agent.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from api.web_search.models import WebSearchRequest
 from api.web_search.service import perform_web_search
+from core.request_body import json_body, json_body_openapi
 
 router = APIRouter()
 
 
-@router.post("/search")
-async def search_endpoint(request: WebSearchRequest):
+@router.post("/search", openapi_extra=json_body_openapi(WebSearchRequest))
+async def search_endpoint(request: WebSearchRequest = Depends(json_body(WebSearchRequest))):
     """Perform web search based on messages."""
     result = await perform_web_search(
         messages=request.messages,
@@ -1,10 +1,12 @@
 """
 AWS Bedrock client wrapper for LangChain.
 """
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from langchain_aws import ChatBedrockConverse
 from langchain_core.messages import BaseMessage
-from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.tools import BaseTool
+from functools import lru_cache
 import os
 import boto3
 
@@ -15,7 +17,10 @@ def get_bedrock_model(
     max_tokens: Optional[int] = None,
     is_tool_calling: bool = False
 ) -> ChatBedrockConverse:
-    """Get AWS Bedrock model instance using the Converse API."""
+    """Get AWS Bedrock model instance using the Converse API.
+    
+    Instances are shared across nodes and requests with the same model settings.
+    """
     from core.utils import get_model_config
     
     model_config = get_model_config(config, is_tool_calling=is_tool_calling)
@@ -35,28 +40,149 @@ def get_bedrock_model(
         max_toks_config = config_dict.get("maxTokens", {})
         max_toks = max_toks_config.get("current", max_toks_config.get("default", 4096))
     
+    return _create_bedrock_model(
+        model_name,
+        region,
+        temp,
+        max_toks,
+        credentials.get("aws_access_key_id"),
+        credentials.get("aws_secret_access_key"),
+    )
+
+
+@lru_cache(maxsize=32)
+def _create_bedrock_model(
+    model_name: str,
+    region: str,
+    temperature: float,
+    max_tokens: int,
+    aws_access_key_id: Optional[str],
+    aws_secret_access_key: Optional[str]
+) -> ChatBedrockConverse:
+    """Create a ChatBedrockConverse instance, cached by its settings."""
+    # Create ChatBedrockConverse instance
+    # Note: ChatBedrockConverse uses temperature and max_tokens as direct parameters, not in model_kwargs
+    # Passing the client up front shares one bedrock-runtime client (and its
+    # connection pool) across models, and keeps the model from building its own
+    return ChatBedrockConverse(
+        model_id=model_name,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        region_name=region,
+        credentials_profile_name=None,  # Use boto3 session instead
+        client=_get_bedrock_runtime_client(region, aws_access_key_id, aws_secret_access_key),
+    )
+
+
+@lru_cache(maxsize=16)
+def _get_bedrock_runtime_client(
+    region: str,
+    aws_access_key_id: Optional[str],
+    aws_secret_access_key: Optional[str]
+):
+    """Create a bedrock-runtime client, cached by region and credentials.
+    
+    The region and credentials are read from the environment on every
+    get_bedrock_model call, so changed credentials get a new client (and
+    model) rather than a cached one.
+    """
     # Create boto3 session with credentials if provided
     session_kwargs = {"region_name": region}
-    if credentials.get("aws_access_key_id") and credentials.get("aws_secret_access_key"):
+    if aws_access_key_id and aws_secret_access_key:
         session_kwargs.update({
-            "aws_access_key_id": credentials["aws_access_key_id"],
-            "aws_secret_access_key": credentials["aws_secret_access_key"],
+            "aws_access_key_id": aws_access_key_id,
+            "aws_secret_access_key": aws_secret_access_key,
         })
     
     # Create boto3 session
     boto_session = boto3.Session(**session_kwargs)
+    return boto_session.client("bedrock-runtime", region_name=region)
+
+
+# Forced-tool bindings keyed by (id(model), tool name); the model is kept in the
+# value so a recycled id can't return another model's binding
+_TOOL_BINDINGS: Dict[Tuple[int, str], Tuple[ChatBedrockConverse, Runnable]] = {}
+_MAX_TOOL_BINDINGS = 64
+
+
+def bind_forced_tool(model: ChatBedrockConverse, tool: BaseTool) -> Runnable:
+    """Bind a single tool to the model with tool_choice forced to it.
     
-    # Create ChatBedrockConverse instance
-    # Note: ChatBedrockConverse uses temperature and max_tokens as direct parameters, not in model_kwargs
-    model = ChatBedrockConverse(
-        model_id=model_name,
-        temperature=temp,
-        max_tokens=max_toks,
-        credentials_profile_name=None,  # Use boto3 session instead
-    )
+    Models from get_bedrock_model are shared, so the binding (tool schema
+    conversion included) is built once per model and reused.
+    """
+    key = (id(model), tool.name)
+    entry = _TOOL_BINDINGS.get(key)
+    if entry is not None and entry[0] is model:
+        return entry[1]
     
-    # Set the boto3 session
-    model.client = boto_session.client("bedrock-runtime", region_name=region)
+    if len(_TOOL_BINDINGS) >= _MAX_TOOL_BINDINGS:
+        _TOOL_BINDINGS.clear()
+    bound = model.bind_tools([tool], tool_choice=tool.name)
+    _TOOL_BINDINGS[key] = (model, bound)
+    return bound
+
+
+# Set BEDROCK_DEBUG_SCHEMA to parse streamed chunks defensively instead of
+# assuming the Converse schema (list of {"text": ...} dicts)
+_DEBUG_SCHEMA = bool(os.getenv("BEDROCK_DEBUG_SCHEMA"))
+
+
+def _chunk_text_defensive(chunk: Any) -> str:
+    """Extract the text of a streamed model chunk, tolerating unexpected shapes."""
+    if hasattr(chunk, "content"):
+        if isinstance(chunk.content, str):
+            return chunk.content
+        if isinstance(chunk.content, list):
+            return "".join(
+                item.get("text", "") if isinstance(item, dict) else str(item)
+                for item in chunk.content
+            )
+        return str(chunk.content)
+    return str(chunk)
+
+
+def _stream_buffer_size(model: ChatBedrockConverse) -> int:
+    """Estimate the UTF-8 size of a full response from the model's max_tokens."""
+    max_tokens = getattr(model, "max_tokens", None) or 4096
+    # ~4 bytes per token, capped so large limits don't reserve megabytes up front
+    return min(max(1024, max_tokens * 4), 256 * 1024)
+
+
+async def collect_stream(
+    model: ChatBedrockConverse,
+    messages: List[BaseMessage],
+    *,
+    _type=type,
+    _list=list,
+    _join="".join,
+) -> str:
+    """Stream the model response and return the accumulated text.
     
-    return model
+    Chunks are UTF-8 encoded into a single bytearray, sized up front from
+    max_tokens and only grown if the response overflows it, then decoded
+    once at the end instead of re-building a string per chunk.
+    The keyword-only defaults bind builtins as locals for the per-chunk loop.
+    """
+    buf = bytearray(_stream_buffer_size(model))
+    pos = 0
+    if _DEBUG_SCHEMA:
+        async for chunk in model.astream(messages):
+            data = _chunk_text_defensive(chunk).encode("utf-8")
+            end = pos + len(data)
+            buf[pos:end] = data
+            pos = end
+    else:
+        async for chunk in model.astream(messages):
+            content = chunk.content
+            if _type(content) is _list:
+                # Reasoning/thinking blocks carry no "text" key and are skipped
+                content = _join([item["text"] for item in content if "text" in item])
+            data = content.encode("utf-8")
+            end = pos + len(data)
+            # Overwrites in place; grows the buffer only past its current size
+            buf[pos:end] = data
+            pos = end
+    del buf[pos:]
+    return buf.decode("utf-8")
 
@@ -0,0 +1,28 @@
+"""
+Read-only view of the configurable fields used by the Open Canvas graph.
+"""
+from typing import NamedTuple, Optional, Mapping, Any
+from langchain_core.runnables import RunnableConfig
+
+
+class OpenCanvasConfig(NamedTuple):
+    """Configurable fields read by Open Canvas nodes."""
+    assistant_id: Optional[str]
+    thread_id: Optional[str]
+    user_id: str
+
+
+def build_config_view(config: Optional[RunnableConfig]) -> OpenCanvasConfig:
+    """Build the config view from a RunnableConfig."""
+    configurable = config.get("configurable", {}) if config else {}
+    return OpenCanvasConfig(
+        assistant_id=configurable.get("open_canvas_assistant_id"),
+        thread_id=configurable.get("thread_id"),
+        user_id=configurable.get("userId", "anonymous"),
+    )
+
+
+def get_config_view(state: Mapping[str, Any], config: Optional[RunnableConfig]) -> OpenCanvasConfig:
+    """Get the config view stashed in state at graph entry, or build it from config."""
+    cfg = state.get("_cfg")
+    return cfg if cfg is not None else build_config_view(config)
@@ -2,17 +2,21 @@
 Global exception handlers for FastAPI.
 """
 import logging
-import traceback
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from core.exceptions import AppException, NotFoundError, ValidationError, InternalServerError
 
 logger = logging.getLogger(__name__)
 
+# Log every Nth request validation error at WARNING, starting with the first
+_VALIDATION_LOG_SAMPLE_EVERY = 100
+_validation_error_count = 0
 
-async def app_exception_handler(request: Request, exc: AppException) -> JSONResponse:
+
+async def app_exception_handler(request: Request, exc: AppException) -> ORJSONResponse:
     """Handle custom application exceptions."""
     logger.error(
         f"AppException: {exc.message}",
@@ -22,7 +26,7 @@ async def app_exception_handler(request: Request, exc: AppException) -> JSONResp
             "method": request.method,
         }
     )
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.message,
@@ -32,9 +36,9 @@ async def app_exception_handler(request: Request, exc: AppException) -> JSONResp
     )
 
 
-async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> ORJSONResponse:
     """Handle HTTP exceptions."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail,
@@ -43,38 +47,46 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException)
     )
 
 
-async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+async def validation_exception_handler(request: Request, exc: RequestValidationError) -> ORJSONResponse:
     """Handle request validation errors."""
+    global _validation_error_count
     errors = exc.errors()
-    logger.warning(
-        f"Validation error: {errors}",
-        extra={
-            "path": request.url.path,
-            "method": request.method,
-        }
-    )
-    return JSONResponse(
+    _validation_error_count += 1
+    extra = {
+        "path": request.url.path,
+        "method": request.method,
+    }
+    # Sample warnings so a flood of bad requests can't swamp the log pipeline;
+    # the rest go to DEBUG, formatted lazily only if that level is enabled
+    if _validation_error_count % _VALIDATION_LOG_SAMPLE_EVERY == 1:
+        logger.warning(
+            f"Validation error ({_validation_error_count} so far): {errors}",
+            extra=extra
+        )
+    else:
+        logger.debug("Validation error: %s", errors, extra=extra)
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "error": "Validation error",
-            "detail": errors,
+            # Errors can carry bytes input or exception objects in ctx
+            "detail": jsonable_encoder(errors),
             "status_code": status.HTTP_422_UNPROCESSABLE_ENTITY,
         }
     )
 
 
-async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def general_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
     """Handle all other unhandled exceptions."""
-    logger.error(
+    # logger.exception attaches the traceback, formatted only if the record is emitted
+    logger.exception(
         f"Unhandled exception: {str(exc)}",
-        exc_info=True,
         extra={
             "path": request.url.path,
             "method": request.method,
-            "traceback": traceback.format_exc(),
         }
     )
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": "Internal server error",
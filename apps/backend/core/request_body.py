@@ -0,0 +1,39 @@
+"""
+JSON request bodies validated directly from raw bytes.
+"""
+from typing import Any, Callable, Dict, Type, TypeVar
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError as PydanticValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def json_body(model: Type[ModelT]) -> Callable[[Request], Any]:
+    """Build a dependency that validates the raw request body as model.
+    
+    Uses model_validate_json, which parses the JSON in pydantic-core instead of
+    json.loads followed by validation of the resulting dict. Validation errors
+    are raised as RequestValidationError, so they still return 422.
+    """
+    async def dependency(request: Request) -> ModelT:
+        body = await request.body()
+        try:
+            return model.model_validate_json(body)
+        except PydanticValidationError as e:
+            raise RequestValidationError([
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ])
+    
+    return dependency
+
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI request body for routes that read it through json_body."""
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+            "required": True,
+        }
+    }
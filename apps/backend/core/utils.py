@@ -1,13 +1,20 @@
 """
 Utility functions for agents.
 """
-from typing import Optional, Dict, Any, List
-from langchain_core.messages import BaseMessage, AIMessage, HumanMessage
+from typing import Optional, Dict, Any, List, Callable, Tuple
+from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, ToolMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
 import uuid
 import base64
 import os
 
+# Placeholder used in prompts when there are no reflections; nodes compare
+# against it to detect that case
+NO_REFLECTIONS = "No reflections found."
+
+# Shared across requests; message objects are never mutated after construction
+DEFAULT_SYSTEM_MSG = SystemMessage(content="You are a helpful AI assistant.")
+
 
 def format_reflections(
     reflections: Dict[str, Any],
@@ -56,30 +63,35 @@ def format_reflections(
     return style_string + "\n\n" + content_string
 
 
+_warned_missing_model_name = False
+
+
 def get_model_config(
     config: RunnableConfig,
     is_tool_calling: bool = False
 ) -> Dict[str, Any]:
     """Get model configuration from config, supporting only AWS Bedrock."""
     from core.models import DEFAULT_MODEL_NAME
+    global _warned_missing_model_name
     
     configurable = config.get("configurable", {}) if config else {}
     custom_model_name = configurable.get("customModelName")
     
-    # Debug logging
     if not custom_model_name:
-        print(f"WARNING: customModelName not found in config. Configurable keys: {list(configurable.keys())}")
-        print(f"WARNING: Full config: {config}")
-        # Use default model name as fallback
+        # Use default model name as fallback; warn once rather than dumping the
+        # config on every model lookup
         custom_model_name = DEFAULT_MODEL_NAME
-        print(f"WARNING: Using default model name: {custom_model_name}")
+        if not _warned_missing_model_name:
+            _warned_missing_model_name = True
+            print(f"WARNING: customModelName not found in config. Configurable keys: {list(configurable.keys())}")
+            print(f"WARNING: Using default model name: {custom_model_name}")
 
     model_config = configurable.get("modelConfig", {})
     
     # Remove bedrock/ prefix if present (for compatibility with frontend)
     # The actual Bedrock model ID doesn't need the prefix
     if custom_model_name.startswith("bedrock/"):
-        actual_model_name = custom_model_name.replace("bedrock/", "", 1)
+        actual_model_name = custom_model_name[len("bedrock/"):]
     else:
         actual_model_name = custom_model_name
     
@@ -95,12 +107,132 @@ def get_model_config(
     }
 
 
-def format_messages(messages: List[BaseMessage], max_length: Optional[int] = None) -> str:
+# History selection for token-limited prompts: the first and the last
+# _RECENT_GROUPS message groups are always kept; only the _GROUP_WINDOW groups
+# before the recent ones are considered for verbatim inclusion
+_RECENT_GROUPS = 5
+_GROUP_WINDOW = 50
+
+
+def group_messages(messages: List[BaseMessage]) -> List[Tuple[int, int]]:
+    """Split messages into groups that must stay together, as (start, end) index ranges.
+    
+    An AIMessage with tool calls forms one group with the ToolMessages that follow it,
+    so a tool result is never separated from its call.
+    """
+    groups = []
+    start = 0
+    while start < len(messages):
+        end = start + 1
+        msg = messages[start]
+        if isinstance(msg, AIMessage) and msg.tool_calls:
+            while end < len(messages) and isinstance(messages[end], ToolMessage):
+                end += 1
+        groups.append((start, end))
+        start = end
+    return groups
+
+
+def split_recent_messages(
+    messages: List[BaseMessage],
+    recent_groups: int = _RECENT_GROUPS
+) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+    """Split messages into older messages and the most recent message groups."""
+    groups = group_messages(messages)
+    if len(groups) <= recent_groups:
+        return [], messages
+    split = groups[-recent_groups][0]
+    return messages[:split], messages[split:]
+
+
+def _score_message(msg: BaseMessage, index: int, total: int, query: Optional[str] = None) -> float:
+    """Score how important a message is to keep in a token-limited prompt.
+    
+    Tool calls/results and messages mentioning the query (e.g. the artifact title)
+    score highest, then user messages, with a recency bonus of index / total.
+    """
+    if getattr(msg, "tool_calls", None) or isinstance(msg, ToolMessage):
+        score = 2.0
+    elif query and query in (msg.content if isinstance(msg.content, str) else str(msg.content)):
+        score = 2.0
+    elif isinstance(msg, HumanMessage):
+        score = 1.5
+    else:
+        score = 1.0
+    return score + index / total
+
+
+def _select_message_groups(
+    messages: List[BaseMessage],
+    formatted: List[str],
+    max_tokens: int,
+    query: Optional[str] = None
+) -> List[str]:
+    """Select formatted messages by group to fit max_tokens.
+    
+    Keeps the first and the most recent groups verbatim. Groups in the window
+    before them are picked greedily by importance per token, and the rest are
+    replaced with a deterministic summary if it fits (otherwise they are dropped).
+    """
+    groups = group_messages(messages)
+    if len(groups) <= _RECENT_GROUPS + 1:
+        return formatted
+    
+    def group_tokens(group: Tuple[int, int]) -> int:
+        return _heuristic_tokens("\n".join(formatted[group[0]:group[1]]))
+    
+    first, middle, recent = groups[0], groups[1:-_RECENT_GROUPS], groups[-_RECENT_GROUPS:]
+    budget = max_tokens - group_tokens(first) - sum(group_tokens(g) for g in recent)
+    
+    # Leave room for the summary of whatever gets dropped
+    summary_reserve = _heuristic_tokens(summarize_dropped(messages[middle[0][0]:middle[-1][1]]))
+    budget -= summary_reserve
+    
+    # Greedy knapsack over the window on importance / tokens
+    total = len(messages)
+    candidates = []
+    for i in range(max(0, len(middle) - _GROUP_WINDOW), len(middle)):
+        start, end = middle[i]
+        score = max(_score_message(messages[j], j, total, query) for j in range(start, end))
+        tokens = group_tokens(middle[i])
+        candidates.append((score / tokens, i, tokens))
+    candidates.sort(reverse=True)
+    
+    kept = set()
+    for _, i, tokens in candidates:
+        if tokens <= budget:
+            kept.add(i)
+            budget -= tokens
+    
+    selected = formatted[first[0]:first[1]]
+    dropped = [msg for i, (start, end) in enumerate(middle) if i not in kept for msg in messages[start:end]]
+    if dropped:
+        summary = summarize_dropped(dropped)
+        if _heuristic_tokens(summary) <= budget + summary_reserve:
+            selected.append(summary)
+    
+    # Back to chronological order
+    for i in sorted(kept):
+        selected.extend(formatted[middle[i][0]:middle[i][1]])
+    selected.extend(formatted[recent[0][0]:])
+    return selected
+
+
+def format_messages(
+    messages: List[BaseMessage],
+    max_length: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    query: Optional[str] = None
+) -> str:
     """Format messages for display.
     
     Args:
         messages: List of messages to format
         max_length: Maximum length of formatted string. If exceeded, truncate from the beginning.
+        max_tokens: Maximum estimated tokens of formatted string. If exceeded, less important
+            older message groups are summarized or dropped first, then the rest is truncated
+            from the beginning.
+        query: Text (e.g. the artifact title) that marks a message as important to keep
     """
     formatted = []
     for idx, msg in enumerate(messages):
@@ -110,9 +242,17 @@ def format_messages(messages: List[BaseMessage], max_length: Optional[int] = Non
     
     result = "\n".join(formatted)
     
-    if max_length and len(result) > max_length:
-        # Truncate from the beginning, keeping the most recent messages
-        truncated = result[-max_length:]
+    if max_tokens and _heuristic_tokens(result) > max_tokens:
+        result = "\n".join(_select_message_groups(messages, formatted, max_tokens, query))
+    
+    truncated = result
+    if max_tokens:
+        truncated = truncate_to_tokens(truncated, max_tokens, keep_end=True)
+    if max_length and len(truncated) > max_length:
+        truncated = truncated[-max_length:]
+    
+    if truncated is not result:
+        # Truncated from the beginning, keeping the most recent messages
         # Try to find a message boundary
         first_msg_start = truncated.find('<')
         if first_msg_start > 0:
@@ -122,6 +262,74 @@ def format_messages(messages: List[BaseMessage], max_length: Optional[int] = Non
     return result
 
 
+def _first_line(content: Any, max_chars: int = 60) -> str:
+    """Get the first non-empty line of message content, shortened to max_chars."""
+    text = content if isinstance(content, str) else str(content)
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            return line if len(line) <= max_chars else line[:max_chars - 3] + "..."
+    return ""
+
+
+def summarize_dropped(messages: List[BaseMessage], max_topics: int = 5) -> str:
+    """Summarize messages dropped from a prompt without calling a model.
+    
+    Lists the message count, the first line of up to max_topics user and
+    assistant messages, and the names of any tools the assistant called.
+    """
+    user_topics = []
+    assistant_topics = []
+    tools = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            if len(user_topics) < max_topics:
+                topic = _first_line(msg.content)
+                if topic:
+                    user_topics.append(topic)
+        elif isinstance(msg, AIMessage):
+            if len(assistant_topics) < max_topics:
+                topic = _first_line(msg.content)
+                if topic:
+                    assistant_topics.append(topic)
+            for tool_call in getattr(msg, "tool_calls", None) or []:
+                name = tool_call.get("name")
+                if name and name not in tools:
+                    tools.append(name)
+    
+    return (
+        f"[Summary of earlier conversation: {len(messages)} messages. "
+        f"User topics: {'; '.join(user_topics) or 'none'}. "
+        f"Assistant topics: {'; '.join(assistant_topics) or 'none'}. "
+        f"Tools used: {', '.join(tools) or 'none'}]"
+    )
+
+
+# Flat charge for non-text content blocks (images, documents): ~750 tokens
+_NON_TEXT_BLOCK_CHARS = 3000
+
+
+def content_len(content: Any) -> int:
+    """Get the character length of message content without stringifying it.
+    
+    Text blocks count their text; non-text blocks are charged a flat size.
+    """
+    if isinstance(content, str):
+        return len(content)
+    if isinstance(content, list):
+        total = 0
+        for block in content:
+            if isinstance(block, str):
+                total += len(block)
+            elif isinstance(block, dict):
+                text = block.get("text")
+                total += len(text) if isinstance(text, str) else _NON_TEXT_BLOCK_CHARS
+            else:
+                total += _NON_TEXT_BLOCK_CHARS
+        return total
+    return len(str(content))
+
+
 def estimate_input_size(content: str) -> int:
     """Estimate the size of content in tokens/characters.
     Rough estimate: 1 token ≈ 4 characters for English text.
@@ -130,6 +338,104 @@ def estimate_input_size(content: str) -> int:
     return len(content)
 
 
+# Chars per token calibrated for Claude models (the Bedrock default):
+# Latin text and code vs CJK and other non-ASCII scripts
+_ASCII_CHARS_PER_TOKEN = 3.5
+_NON_ASCII_CHARS_PER_TOKEN = 1.3
+
+# Set OC_TOKEN_EST_MODE=validated to compare estimates against tiktoken (if installed)
+_VALIDATE_TOKEN_ESTIMATES = os.getenv("OC_TOKEN_EST_MODE", "").lower() == "validated"
+_tiktoken_encoding = None
+
+
+def _validate_token_estimate(content: str, estimate: int) -> None:
+    """Warn when the heuristic estimate is off by more than 15% from tiktoken."""
+    global _tiktoken_encoding
+    if _tiktoken_encoding is None:
+        try:
+            import tiktoken
+        except ImportError:
+            print("Warning: OC_TOKEN_EST_MODE=validated requires tiktoken. Skipping validation.", flush=True)
+            return
+        _tiktoken_encoding = tiktoken.get_encoding("cl100k_base")
+    
+    accurate = len(_tiktoken_encoding.encode(content))
+    if accurate and abs(estimate - accurate) / accurate > 0.15:
+        print(f"Warning: Token estimate {estimate} differs from tiktoken count {accurate} "
+              f"for {len(content)} chars.", flush=True)
+
+
+def _heuristic_tokens(content: str) -> int:
+    """Calibrated chars-per-token estimate, without validation."""
+    ascii_chars = len(content.encode("ascii", "ignore"))
+    non_ascii_chars = len(content) - ascii_chars
+    return int(ascii_chars / _ASCII_CHARS_PER_TOKEN + non_ascii_chars / _NON_ASCII_CHARS_PER_TOKEN) + 1
+
+
+def estimate_tokens(content: str) -> int:
+    """Estimate the number of tokens in content.
+    
+    Counts ASCII and non-ASCII characters separately, since non-ASCII
+    scripts (e.g. CJK) use far fewer characters per token than English or code.
+    """
+    estimate = _heuristic_tokens(content)
+    if _VALIDATE_TOKEN_ESTIMATES:
+        _validate_token_estimate(content, estimate)
+    return estimate
+
+
+# Sentence boundaries to cut at, searched within the last/first 200 chars of a cut
+_SENTENCE_BOUNDARIES = ("\n\n", ". ", "? ", "! ")
+_BOUNDARY_WINDOW = 200
+
+
+def truncate_to_tokens(
+    text: str,
+    max_tokens: int,
+    count_fn: Callable[[str], int] = _heuristic_tokens,
+    keep_end: bool = False
+) -> str:
+    """Truncate text to at most max_tokens tokens, cutting at a sentence boundary where possible.
+    
+    Args:
+        text: Text to truncate
+        max_tokens: Maximum number of tokens to keep
+        count_fn: Token counting function (defaults to the calibrated heuristic)
+        keep_end: Keep the end of the text instead of the beginning
+    """
+    if count_fn(text) <= max_tokens:
+        return text
+    
+    # Binary search for the longest prefix (or suffix) within the budget
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        part = text[len(text) - mid:] if keep_end else text[:mid]
+        if count_fn(part) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    
+    if keep_end:
+        kept = text[len(text) - lo:]
+        # Start after the first sentence boundary near the cut
+        cut = -1
+        for boundary in _SENTENCE_BOUNDARIES:
+            idx = kept.find(boundary, 0, _BOUNDARY_WINDOW)
+            if idx >= 0 and (cut < 0 or idx + len(boundary) < cut):
+                cut = idx + len(boundary)
+        return kept[cut:] if cut >= 0 else kept
+    
+    kept = text[:lo]
+    # End after the last sentence boundary near the cut
+    cut = -1
+    for boundary in _SENTENCE_BOUNDARIES:
+        idx = kept.rfind(boundary, max(0, lo - _BOUNDARY_WINDOW))
+        if idx >= 0:
+            cut = max(cut, idx + len(boundary))
+    return kept[:cut].rstrip() if cut >= 0 else kept
+
+
 def truncate_content(content: str, max_size: int, suffix: str = "...[truncated]") -> str:
     """Truncate content to maximum size, preserving the end."""
     if len(content) <= max_size:
@@ -227,7 +533,7 @@ def extract_latest_artifact_version(artifact: Optional[Dict[str, Any]]) -> Optio
         return artifact
     
     contents = artifact.get("contents", [])
-    if not contents or not isinstance(contents, list):
+    if not contents or not isinstance(contents, (list, tuple)):
         # If no contents array, return as is (backward compatibility)
         return artifact
     
@@ -346,7 +652,7 @@ def extract_thinking_and_response_tokens(text: str) -> Dict[str, str]:
 def get_formatted_reflections(config: RunnableConfig) -> str:
     """Get formatted reflections from config or store."""
     if not config:
-        return "No reflections found."
+        return NO_REFLECTIONS
     
     configurable = config.get("configurable", {})
     reflections_dict = configurable.get("reflections", {})
@@ -367,7 +673,7 @@ def get_formatted_reflections(config: RunnableConfig) -> str:
                 pass
     
     if not reflections_dict:
-        return "No reflections found."
+        return NO_REFLECTIONS
     
     return format_reflections(reflections_dict)
 
@@ -12,101 +12,159 @@ Usage:
 """
 import sys
 import os
+import hashlib
+import importlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+_BASE_DIR = os.path.dirname(__file__)
 
 # Add the agents directory to the path
-sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, _BASE_DIR)
 
-from visualize.diagrams import generate_diagram_for_graph
+# All available graphs
+_ALL_GRAPHS = {
+    name: {
+        "path": os.path.join(_BASE_DIR, "agents", name, "graph.py"),
+        "output_dir": os.path.join(_BASE_DIR, "agents", name),
+    }
+    for name in ("open_canvas", "reflection", "web_search", "summarizer", "thread_title")
+}
 
 
+@lru_cache(maxsize=None)
 def load_graph(graph_name: str):
-    """Load a graph module by name."""
-    import importlib.util
+    """Load a graph module by name.
+    
+    Goes through the regular import system, so a graph already imported by
+    another graph (or requested twice) isn't re-executed.
+    """
+    module_name = f"agents.{graph_name}.graph"
+    try:
+        module = importlib.import_module(module_name)
+    except ModuleNotFoundError as e:
+        # Only a missing graph module is reported as such; a missing
+        # dependency of the graph propagates unchanged
+        if e.name is None or not f"{module_name}.".startswith(f"{e.name}."):
+            raise
+        graph_path = os.path.join(_BASE_DIR, "agents", graph_name, "graph.py")
+        raise FileNotFoundError(f"Graph not found: {graph_path}") from e
     
-    base_dir = os.path.dirname(__file__)
-    graph_path = os.path.join(base_dir, graph_name, "graph.py")
+    return module.graph
+
+
+def _mermaid_hash_path(graph_name: str, output_dir: str) -> str:
+    """Path of the sidecar file holding the hash of the last rendered Mermaid source."""
+    return os.path.join(output_dir, f"{graph_name}.mermaid.sha256")
+
+
+def _is_unchanged(graph_name: str, output_dir: str, mermaid_hash: str) -> bool:
+    """Whether the diagrams on disk were rendered from the same Mermaid source."""
+    png_file = os.path.join(output_dir, f"{graph_name}_diagram.png")
+    if not os.path.exists(png_file):
+        return False
+    try:
+        with open(_mermaid_hash_path(graph_name, output_dir)) as f:
+            return f.read().strip() == mermaid_hash
+    except OSError:
+        return False
+
+
+def _write_mermaid_hash(graph_name: str, output_dir: str, mermaid_hash: str) -> None:
+    """Write the hash sidecar atomically so an interrupted run can't leave a partial file."""
+    hash_path = _mermaid_hash_path(graph_name, output_dir)
+    tmp_path = f"{hash_path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(mermaid_hash)
+    os.replace(tmp_path, hash_path)
+
+
+def _render_one(graph_name: str, graph_info: dict) -> tuple[str, bool]:
+    """Load a graph and generate its diagrams; runs in a worker process.
     
-    if not os.path.exists(graph_path):
-        raise FileNotFoundError(f"Graph not found: {graph_path}")
+    PNG rendering is skipped when the graph's Mermaid source is unchanged since
+    the last run and the PNG is still on disk.
+    """
+    # Imported here so argument errors exit before the diagram stack is loaded
+    from visualize.diagrams import generate_diagram_for_graph
     
-    spec = importlib.util.spec_from_file_location(graph_name, graph_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    try:
+        graph = load_graph(graph_name)
+    except Exception as e:
+        # Nothing to render for a graph that didn't load
+        print(f"Error loading graph {graph_name}: {e}", file=sys.stderr, flush=True)
+        return (graph_name, False)
     
-    return module.graph
+    try:
+        output_dir = graph_info["output_dir"]
+        graph_structure = graph.get_graph()
+        if not any(node_id not in ("__start__", "__end__") for node_id in graph_structure.nodes):
+            print(f"Error: graph {graph_name} has no nodes, skipping", file=sys.stderr, flush=True)
+            return (graph_name, False)
+        
+        mermaid_code = graph_structure.draw_mermaid()
+        mermaid_hash = hashlib.sha256(mermaid_code.encode("utf-8")).hexdigest()
+        if _is_unchanged(graph_name, output_dir, mermaid_hash):
+            print(f"{graph_name}: unchanged, skipping", flush=True)
+            return (graph_name, True)
+        
+        mermaid_file, png_file = generate_diagram_for_graph(
+            graph,
+            graph_name,
+            output_dir,
+            print_ascii=False,
+            generate_png=True
+        )
+        # Only record the hash once the PNG was rendered, so a failed render is retried
+        if png_file is not None:
+            _write_mermaid_hash(graph_name, output_dir, mermaid_hash)
+        return (graph_name, mermaid_file is not None)
+    except Exception as e:
+        print(f"Error generating diagram for {graph_name}: {e}", file=sys.stderr, flush=True)
+        return (graph_name, False)
 
 
 def main():
     """Generate diagrams for graphs."""
-    base_dir = os.path.dirname(__file__)
-    
-    # All available graphs
-    all_graphs = {
-        "open_canvas": {
-            "path": os.path.join(base_dir, "open_canvas", "graph.py"),
-            "output_dir": os.path.join(base_dir, "open_canvas"),
-        },
-        "reflection": {
-            "path": os.path.join(base_dir, "reflection", "graph.py"),
-            "output_dir": os.path.join(base_dir, "reflection"),
-        },
-        "web_search": {
-            "path": os.path.join(base_dir, "web_search", "graph.py"),
-            "output_dir": os.path.join(base_dir, "web_search"),
-        },
-        "summarizer": {
-            "path": os.path.join(base_dir, "summarizer", "graph.py"),
-            "output_dir": os.path.join(base_dir, "summarizer"),
-        },
-        "thread_title": {
-            "path": os.path.join(base_dir, "thread_title", "graph.py"),
-            "output_dir": os.path.join(base_dir, "thread_title"),
-        },
-    }
-    
     # Parse command line arguments
     if len(sys.argv) > 1:
         # Generate specific graph(s)
         graph_names = sys.argv[1:]
-        invalid = [name for name in graph_names if name not in all_graphs]
+        invalid = [name for name in graph_names if name not in _ALL_GRAPHS]
         if invalid:
-            print(f"Error: Unknown graph(s): {', '.join(invalid)}")
-            print(f"Available graphs: {', '.join(all_graphs.keys())}")
+            print(f"Error: Unknown graph(s): {', '.join(invalid)}", file=sys.stderr)
+            print(f"Available graphs: {', '.join(_ALL_GRAPHS.keys())}", file=sys.stderr)
             sys.exit(1)
-        graphs_to_generate = {name: all_graphs[name] for name in graph_names}
+        graphs_to_generate = {name: _ALL_GRAPHS[name] for name in graph_names}
     else:
         # Generate all graphs
-        graphs_to_generate = all_graphs
+        graphs_to_generate = _ALL_GRAPHS
     
     print("="*80)
     print("Generating diagrams for Open Canvas graphs")
     print("="*80)
     
-    results = []
-    for graph_name, graph_info in graphs_to_generate.items():
-        try:
-            graph = load_graph(graph_name)
-            mermaid_file, png_file = generate_diagram_for_graph(
-                graph,
-                graph_name,
-                graph_info["output_dir"],
-                print_ascii=False,
-                generate_png=True
-            )
-            success = mermaid_file is not None
-            results.append((graph_name, success))
-        except Exception as e:
-            print(f"Error loading graph {graph_name}: {e}")
-            results.append((graph_name, False))
-    
-    print("\n" + "="*80)
-    print("Summary:")
-    print("="*80)
-    for name, success in results:
-        status = "✓" if success else "✗"
-        print(f"{status} {name}")
+    # One worker process per graph: each gets its own import state and the
+    # PNG rendering of different graphs runs in parallel
+    max_workers = min(len(graphs_to_generate), os.cpu_count() or 1)
+    completed = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_render_one, graph_name, graph_info)
+            for graph_name, graph_info in graphs_to_generate.items()
+        ]
+        for future in as_completed(futures):
+            graph_name, success = future.result()
+            completed[graph_name] = success
+    results = [(name, completed[name]) for name in graphs_to_generate]
     
-    print("\nAll diagrams generated!")
+    # Built as one string and written once rather than printed line by line
+    summary_lines = [f"{'✓' if success else '✗'} {name}" for name, success in results]
+    sys.stdout.write(
+        "\n" + "="*80 + "\nSummary:\n" + "="*80 + "\n"
+        + "\n".join(summary_lines)
+        + "\n\nAll diagrams generated!\n"
+    )
 
 
 if __name__ == "__main__":
@@ -1,7 +1,9 @@
 """
 FastAPI application for Open Canvas agents with AWS Bedrock support.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -36,7 +38,16 @@ if langchain_api_key:
 else:
     print("Warning: LANGCHAIN_API_KEY or LANGSMITH_API_KEY not set. LangSmith tracing will be disabled.", flush=True)
 
-app = FastAPI(title="Open Canvas Agents API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release shared clients on shutdown."""
+    yield
+    from api.runs.service import close_langsmith_http_client
+    await close_langsmith_http_client()
+
+
+app = FastAPI(title="Open Canvas Agents API", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Register exception handlers
 app.add_exception_handler(AppException, app_exception_handler)
@@ -2,29 +2,44 @@
 Base storage interface for persistent storage backends.
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, Sequence
+
+
+@lru_cache(maxsize=4096)
+def namespace_key(namespace: Tuple[str, ...]) -> str:
+    """Convert a namespace tuple to its string key, cached per namespace."""
+    return "/".join(str(n) for n in namespace)
 
 
 class BaseStorage(ABC):
     """Base interface for storage backends."""
     
     @abstractmethod
-    def get_item(self, namespace: List[str], key: str) -> Optional[Dict[str, Any]]:
+    def get_item(self, namespace: Sequence[str], key: str) -> Optional[Dict[str, Any]]:
         """Get an item from the store."""
         pass
     
     @abstractmethod
-    def put_item(self, namespace: List[str], key: str, value: Any) -> None:
+    def put_item(self, namespace: Sequence[str], key: str, value: Any) -> None:
         """Put an item into the store."""
         pass
     
+    def put_items(self, items: List[Tuple[Sequence[str], str, Any]]) -> None:
+        """Put several (namespace, key, value) items into the store.
+        
+        Backends with a batch write API override this; the default puts them one by one.
+        """
+        for namespace, key, value in items:
+            self.put_item(namespace, key, value)
+    
     @abstractmethod
-    def delete_item(self, namespace: List[str], key: str) -> bool:
+    def delete_item(self, namespace: Sequence[str], key: str) -> bool:
         """Delete an item from the store."""
         pass
     
     @abstractmethod
-    def list_items(self, namespace: List[str], prefix: Optional[str] = None) -> List[str]:
+    def list_items(self, namespace: Sequence[str], prefix: Optional[str] = None) -> List[str]:
         """List all keys in a namespace, optionally filtered by prefix."""
         pass
 
@@ -4,9 +4,10 @@ DynamoDB storage backend for persistent storage.
 import json
 import os
 import sys
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Sequence
 from datetime import datetime
-from store.base import BaseStorage, BaseEntityStorage
+from store.base import BaseStorage, BaseEntityStorage, namespace_key
+from store.thread_storage import matches_metadata_filter
 
 try:
     import boto3
@@ -81,11 +82,11 @@ class DynamoDBStorage(BaseStorage):
             if e.response["Error"]["Code"] != "ResourceInUseException":
                 raise
     
-    def _get_namespace_key(self, namespace: List[str]) -> str:
+    def _get_namespace_key(self, namespace: Sequence[str]) -> str:
         """Convert namespace list to a string key."""
-        return "/".join(str(n) for n in namespace)
+        return namespace_key(tuple(namespace))
     
-    def get_item(self, namespace: List[str], key: str) -> Optional[Dict[str, Any]]:
+    def get_item(self, namespace: Sequence[str], key: str) -> Optional[Dict[str, Any]]:
         """Get an item from the store."""
         namespace_key = self._get_namespace_key(namespace)
         
@@ -115,7 +116,7 @@ class DynamoDBStorage(BaseStorage):
         except ClientError as e:
             raise Exception(f"DynamoDB error: {str(e)}")
     
-    def put_item(self, namespace: List[str], key: str, value: Any) -> None:
+    def put_item(self, namespace: Sequence[str], key: str, value: Any) -> None:
         """Put an item into the store."""
         namespace_key = self._get_namespace_key(namespace)
         updated_at = datetime.utcnow().isoformat()
@@ -134,7 +135,27 @@ class DynamoDBStorage(BaseStorage):
         except ClientError as e:
             raise Exception(f"DynamoDB error: {str(e)}")
     
-    def delete_item(self, namespace: List[str], key: str) -> bool:
+    def put_items(self, items: List[Tuple[Sequence[str], str, Any]]) -> None:
+        """Put several items into the store with BatchWriteItem (25 items per request)."""
+        updated_at = datetime.utcnow().isoformat()
+        
+        try:
+            # overwrite_by_pkeys keeps only the last write when a key repeats,
+            # since a single BatchWriteItem request can't contain duplicate keys
+            with self.table.batch_writer(overwrite_by_pkeys=["namespace", "key"]) as batch:
+                for namespace, key, value in items:
+                    batch.put_item(
+                        Item={
+                            "namespace": self._get_namespace_key(namespace),
+                            "key": key,
+                            "value": json.dumps(value) if not isinstance(value, str) else value,
+                            "updated_at": updated_at,
+                        }
+                    )
+        except ClientError as e:
+            raise Exception(f"DynamoDB error: {str(e)}")
+    
+    def delete_item(self, namespace: Sequence[str], key: str) -> bool:
         """Delete an item from the store."""
         namespace_key = self._get_namespace_key(namespace)
         
@@ -151,7 +172,7 @@ class DynamoDBStorage(BaseStorage):
         except ClientError as e:
             raise Exception(f"DynamoDB error: {str(e)}")
     
-    def list_items(self, namespace: List[str], prefix: Optional[str] = None) -> List[str]:
+    def list_items(self, namespace: Sequence[str], prefix: Optional[str] = None) -> List[str]:
         """List all keys in a namespace, optionally filtered by prefix."""
         namespace_key = self._get_namespace_key(namespace)
         
@@ -612,44 +633,89 @@ class DynamoDBThreadStorage:
         except ClientError as e:
             raise Exception(f"DynamoDB error: {str(e)}")
     
-    def search_threads(self, limit: int = 100) -> List[Dict]:
-        """Search threads sorted by updated_at descending.
+    def search_threads(self, limit: int = 100, filters: Optional[Dict] = None) -> List[Dict]:
+        """Search threads sorted by updated_at descending, optionally filtered by metadata.
         
-        Includes first message for each thread to avoid N+1 queries.
+        Includes first message for each thread to avoid N+1 queries. The scan
+        reads only thread metadata; messages are batch-fetched for the threads
+        that are returned.
         """
+        # Collect more than limit to sort (DynamoDB doesn't support sorting in scan)
+        wanted = limit * 2
+        scan_kwargs = {
+            "Limit": wanted,
+            "ProjectionExpression": "#id, #md, #ca, #ua",
+            "ExpressionAttributeNames": {
+                "#id": "thread_id",
+                "#md": "metadata",
+                "#ca": "created_at",
+                "#ua": "updated_at",
+            },
+        }
+        
         try:
-            # Scan all threads (DynamoDB doesn't support sorting in query)
-            response = self.threads_table.scan(Limit=limit * 2)  # Get more to sort
-            
             threads = []
-            for item in response.get("Items", []):
-                metadata_str = item.get("metadata", "{}")
-                metadata = json.loads(metadata_str) if isinstance(metadata_str, str) else metadata_str
-                
-                # Extract first message from messages field to avoid N+1 queries
-                first_message = None
-                messages_str = item.get("messages", "[]")
-                try:
-                    messages = json.loads(messages_str) if isinstance(messages_str, str) else messages_str
-                    if isinstance(messages, list) and len(messages) > 0:
-                        first_message = messages[0]
-                except (json.JSONDecodeError, TypeError):
-                    pass
+            # Keep scanning until enough threads match or the table is exhausted,
+            # so a selective filter still finds matches beyond the first page
+            while len(threads) < wanted:
+                response = self.threads_table.scan(**scan_kwargs)
+                for item in response.get("Items", []):
+                    metadata_str = item.get("metadata", "{}")
+                    metadata = json.loads(metadata_str) if isinstance(metadata_str, str) else metadata_str
+                    # Metadata is stored as a JSON string, so it can't be filtered in the scan
+                    if filters and not matches_metadata_filter(metadata, filters):
+                        continue
+                    
+                    threads.append({
+                        "thread_id": item["thread_id"],
+                        "metadata": metadata,
+                        "created_at": item.get("created_at"),
+                        "updated_at": item.get("updated_at"),
+                    })
                 
-                threads.append({
-                    "thread_id": item["thread_id"],
-                    "metadata": metadata,
-                    "created_at": item.get("created_at"),
-                    "updated_at": item.get("updated_at"),
-                    "first_message": first_message,  # Include first message to avoid N+1 queries
-                })
+                last_key = response.get("LastEvaluatedKey")
+                if not last_key:
+                    break
+                scan_kwargs["ExclusiveStartKey"] = last_key
             
             # Sort by updated_at descending
             threads.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
-            return threads[:limit]
+            threads = threads[:limit]
+            
+            first_messages = self._get_first_messages([t["thread_id"] for t in threads])
+            for thread in threads:
+                thread["first_message"] = first_messages.get(thread["thread_id"])
+            return threads
         except ClientError as e:
             raise Exception(f"DynamoDB error: {str(e)}")
     
+    def _get_first_messages(self, thread_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """Get the first message of each thread with batched reads."""
+        first_messages: Dict[str, Optional[Dict]] = {}
+        # BatchGetItem accepts at most 100 keys per request
+        for start in range(0, len(thread_ids), 100):
+            request_items = {
+                self.threads_table_name: {
+                    "Keys": [{"thread_id": thread_id} for thread_id in thread_ids[start:start + 100]],
+                    "ProjectionExpression": "#id, #msgs",
+                    "ExpressionAttributeNames": {"#id": "thread_id", "#msgs": "messages"},
+                }
+            }
+            while request_items:
+                response = self.dynamodb.batch_get_item(RequestItems=request_items)
+                for item in response.get("Responses", {}).get(self.threads_table_name, []):
+                    messages_str = item.get("messages", "[]")
+                    try:
+                        messages = json.loads(messages_str) if isinstance(messages_str, str) else messages_str
+                    except (json.JSONDecodeError, TypeError):
+                        messages = None
+                    first_messages[item["thread_id"]] = (
+                        messages[0] if isinstance(messages, list) and messages else None
+                    )
+                # Retry keys DynamoDB couldn't process in this round
+                request_items = response.get("UnprocessedKeys") or None
+        return first_messages
+    
     def get_thread_messages(self, thread_id: str) -> List[Dict]:
         """Get all messages for a thread."""
         try:
@@ -744,21 +810,17 @@ class DynamoDBThreadStorage:
     def get_thread_artifact_latest(self, thread_id: str) -> Optional[Dict]:
         """Get the latest artifact version for a thread."""
         try:
-            # Query all versions to find the latest one
+            # version_index is the sort key: read only the highest one instead of every version
             response = self.artifacts_table.query(
                 KeyConditionExpression=Key("thread_id").eq(thread_id),
+                ScanIndexForward=False,
+                Limit=1,
             )
             
-            if not response.get("Items"):
-                return None
-            
-            # Find the latest version by comparing version_index
-            items = response["Items"]
+            items = response.get("Items")
             if not items:
                 return None
-            
-            # Find latest version_index
-            latest_item = max(items, key=lambda x: x.get("version_index", 0))
+            latest_item = items[0]
             
             artifact_str = latest_item.get("artifact_data")
             try:
@@ -807,9 +869,9 @@ class DynamoDBThreadStorage:
             if not response.get("Items"):
                 return None
             
-            items = response["Items"]
-            version_indices = sorted([item["version_index"] for item in items if "version_index" in item])
-            latest_index = max(version_indices) if version_indices else None
+            # Items come back in sort key order, so no sorting is needed
+            version_indices = [item["version_index"] for item in response["Items"] if "version_index" in item]
+            latest_index = version_indices[-1] if version_indices else None
             
             return {
                 "version_indices": version_indices,
@@ -1,9 +1,10 @@
 """
 In-memory storage backend (for backward compatibility and testing).
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Sequence
 from datetime import datetime
-from store.base import BaseStorage, BaseEntityStorage
+from store.base import BaseStorage, BaseEntityStorage, namespace_key
+from store.thread_storage import matches_metadata_filter
 
 
 class MemoryStorage(BaseStorage):
@@ -14,11 +15,11 @@ class MemoryStorage(BaseStorage):
         # Store structure: {namespace_key: {key: {value: ..., updatedAt: ...}}}
         self._store: Dict[str, Dict[str, Dict[str, Any]]] = {}
     
-    def _get_namespace_key(self, namespace: List[str]) -> str:
+    def _get_namespace_key(self, namespace: Sequence[str]) -> str:
         """Convert namespace list to a string key."""
-        return "/".join(str(n) for n in namespace)
+        return namespace_key(tuple(namespace))
     
-    def get_item(self, namespace: List[str], key: str) -> Optional[Dict[str, Any]]:
+    def get_item(self, namespace: Sequence[str], key: str) -> Optional[Dict[str, Any]]:
         """Get an item from the store."""
         namespace_key = self._get_namespace_key(namespace)
         if namespace_key not in self._store:
@@ -31,7 +32,7 @@ class MemoryStorage(BaseStorage):
             "updatedAt": item.get("updatedAt"),
         }
     
-    def put_item(self, namespace: List[str], key: str, value: Any) -> None:
+    def put_item(self, namespace: Sequence[str], key: str, value: Any) -> None:
         """Put an item into the store."""
         namespace_key = self._get_namespace_key(namespace)
         if namespace_key not in self._store:
@@ -42,7 +43,7 @@ class MemoryStorage(BaseStorage):
             "updatedAt": datetime.utcnow().isoformat(),
         }
     
-    def delete_item(self, namespace: List[str], key: str) -> bool:
+    def delete_item(self, namespace: Sequence[str], key: str) -> bool:
         """Delete an item from the store."""
         namespace_key = self._get_namespace_key(namespace)
         if namespace_key not in self._store:
@@ -52,7 +53,7 @@ class MemoryStorage(BaseStorage):
         del self._store[namespace_key][key]
         return True
     
-    def list_items(self, namespace: List[str], prefix: Optional[str] = None) -> List[str]:
+    def list_items(self, namespace: Sequence[str], prefix: Optional[str] = None) -> List[str]:
         """List all keys in a namespace, optionally filtered by prefix."""
         namespace_key = self._get_namespace_key(namespace)
         if namespace_key not in self._store:
@@ -170,6 +171,61 @@ class MemoryThreadStorage:
         self._threads: Dict[str, Dict] = {}
         # artifacts: {thread_id: {version_index: artifact_data}}
         self._artifacts: Dict[str, Dict[int, Dict]] = {}
+        # Artifact version metadata, rebuilt on write so reads are a dict lookup
+        self._artifact_index: Dict[str, Dict[str, Any]] = {}
+        # Metadata inverted index: {key: {value: {thread_id}}}, plus {key: {thread_id}}
+        # for every thread that has the key (including unhashable values)
+        self._meta_index: Dict[str, Dict[Any, Set[str]]] = {}
+        self._meta_keys: Dict[str, Set[str]] = {}
+    
+    def _index_metadata(self, thread_id: str, metadata: Dict) -> None:
+        """Add a thread's metadata to the index."""
+        for key, value in metadata.items():
+            self._meta_keys.setdefault(key, set()).add(thread_id)
+            try:
+                self._meta_index.setdefault(key, {}).setdefault(value, set()).add(thread_id)
+            except TypeError:
+                # Unhashable values (lists, dicts) are only matched by scanning
+                pass
+    
+    def _unindex_metadata(self, thread_id: str, metadata: Dict) -> None:
+        """Remove a thread's metadata from the index."""
+        for key, value in metadata.items():
+            self._meta_keys.get(key, set()).discard(thread_id)
+            try:
+                self._meta_index.get(key, {}).get(value, set()).discard(thread_id)
+            except TypeError:
+                pass
+    
+    def _filter_thread_ids(self, filters: Dict) -> Set[str]:
+        """Get the IDs of threads matching a metadata filter using the index."""
+        thread_ids = set(self._threads)
+        for key, value in filters.items():
+            try:
+                equal = self._meta_index.get(key, {}).get(value, set())
+            except TypeError:
+                # Unhashable filter value; fall back to comparing each candidate
+                thread_ids = {
+                    thread_id for thread_id in thread_ids
+                    if matches_metadata_filter(self._threads[thread_id]["metadata"], {key: value})
+                }
+                continue
+            # Threads without the key still match
+            thread_ids -= self._meta_keys.get(key, set()) - equal
+        return thread_ids
+    
+    def _reindex_artifact(self, thread_id: str) -> None:
+        """Rebuild the version metadata of a thread's artifact after a write."""
+        versions = self._artifacts.get(thread_id)
+        if not versions:
+            self._artifact_index.pop(thread_id, None)
+            return
+        version_indices = sorted(versions.keys())
+        self._artifact_index[thread_id] = {
+            "version_indices": version_indices,
+            "current_index": version_indices[-1],
+            "total_versions": len(version_indices),
+        }
     
     def create_thread(self, thread_id: str, metadata: Optional[Dict] = None) -> Dict:
         """Create a new thread."""
@@ -181,7 +237,10 @@ class MemoryThreadStorage:
             "created_at": now,
             "updated_at": now,
         }
+        if thread_id in self._threads:
+            self._unindex_metadata(thread_id, self._threads[thread_id]["metadata"])
         self._threads[thread_id] = thread
+        self._index_metadata(thread_id, thread["metadata"])
         return thread
     
     def get_thread(self, thread_id: str) -> Optional[Dict]:
@@ -203,25 +262,31 @@ class MemoryThreadStorage:
             return None
         
         thread = self._threads[thread_id]
+        self._unindex_metadata(thread_id, thread["metadata"])
         thread["metadata"] = {**thread.get("metadata", {}), **metadata}
+        self._index_metadata(thread_id, thread["metadata"])
         thread["updated_at"] = datetime.utcnow().isoformat()
         return thread
     
     def delete_thread(self, thread_id: str) -> bool:
         """Delete thread and all associated data."""
         if thread_id in self._threads:
+            self._unindex_metadata(thread_id, self._threads[thread_id]["metadata"])
             del self._threads[thread_id]
         if thread_id in self._artifacts:
             del self._artifacts[thread_id]
+        self._artifact_index.pop(thread_id, None)
         return True
     
-    def search_threads(self, limit: int = 100) -> List[Dict]:
-        """Search threads sorted by updated_at descending.
+    def search_threads(self, limit: int = 100, filters: Optional[Dict] = None) -> List[Dict]:
+        """Search threads sorted by updated_at descending, optionally filtered by metadata.
         
         Includes first message for each thread to avoid N+1 queries.
         """
+        thread_ids = self._filter_thread_ids(filters) if filters else self._threads
         threads = []
-        for thread in self._threads.values():
+        for thread_id in thread_ids:
+            thread = self._threads[thread_id]
             # Extract first message to avoid N+1 queries
             messages = thread.get("messages", [])
             first_message = messages[0] if messages else None
@@ -294,16 +359,10 @@ class MemoryThreadStorage:
     
     def get_thread_artifact_latest(self, thread_id: str) -> Optional[Dict]:
         """Get the latest artifact version for a thread."""
-        if thread_id not in self._artifacts or not self._artifacts[thread_id]:
-            return None
-        
-        versions = self._artifacts[thread_id]
-        if not versions:
+        index = self._artifact_index.get(thread_id)
+        if index is None:
             return None
-        
-        # Get the latest version (highest version_index)
-        latest_index = max(versions.keys())
-        return versions[latest_index]
+        return self._artifacts[thread_id][index["current_index"]]
     
     def get_thread_artifact_version(self, thread_id: str, version_index: int) -> Optional[Dict]:
         """Get a specific artifact version for a thread."""
@@ -312,18 +371,15 @@ class MemoryThreadStorage:
         return self._artifacts[thread_id].get(version_index)
     
     def get_thread_artifact_metadata(self, thread_id: str) -> Optional[Dict]:
-        """Get artifact metadata (version list, current_index, etc.) without full content."""
-        if thread_id not in self._artifacts or not self._artifacts[thread_id]:
-            return None
-        
-        version_indices = sorted(self._artifacts[thread_id].keys())
-        latest_index = max(version_indices) if version_indices else None
+        """Get artifact metadata (version list, current_index, etc.) without full content.
         
-        return {
-            "version_indices": version_indices,
-            "current_index": latest_index,
-            "total_versions": len(version_indices),
-        }
+        Served from the index built at write time; returns a copy so callers
+        can't change the index.
+        """
+        metadata = self._artifact_index.get(thread_id)
+        if metadata is None:
+            return None
+        return {**metadata, "version_indices": list(metadata["version_indices"])}
     
     def set_thread_artifact(self, thread_id: str, artifact: Dict) -> None:
         """Set artifact for a thread (saves each version separately)."""
@@ -346,6 +402,7 @@ class MemoryThreadStorage:
                     "contents": [content],
                 }
                 self._artifacts[thread_id][version_index] = version_artifact
+        self._reindex_artifact(thread_id)
         
         if thread_id in self._threads:
             self._threads[thread_id]["updated_at"] = datetime.utcnow().isoformat()
@@ -354,6 +411,7 @@ class MemoryThreadStorage:
         """Delete artifact for a thread (all versions)."""
         if thread_id in self._artifacts:
             del self._artifacts[thread_id]
+            self._artifact_index.pop(thread_id, None)
             return True
         return False
 
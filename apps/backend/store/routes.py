@@ -5,7 +5,7 @@ Implements LangGraph SDK compatible store endpoints.
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict, Any, List
-from store.store import store
+import store.store as store_module
 
 router = APIRouter()
 
@@ -33,7 +33,7 @@ class StoreDeleteRequest(BaseModel):
 async def get_store_item(request: StoreGetRequest):
     """Get an item from the store."""
     try:
-        item = store.get_item(request.namespace, request.key)
+        item = store_module.store.get_item(request.namespace, request.key)
         if item is None:
             return {"item": None}
         return {"item": item}
@@ -45,7 +45,7 @@ async def get_store_item(request: StoreGetRequest):
 async def put_store_item(request: StorePutRequest):
     """Put an item into the store."""
     try:
-        store.put_item(request.namespace, request.key, request.value)
+        store_module.store.put_item(request.namespace, request.key, request.value)
         return {"success": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -55,7 +55,7 @@ async def put_store_item(request: StorePutRequest):
 async def delete_store_item(request: StoreDeleteRequest):
     """Delete an item from the store."""
     try:
-        deleted = store.delete_item(request.namespace, request.key)
+        deleted = store_module.store.delete_item(request.namespace, request.key)
         if not deleted:
             raise HTTPException(status_code=404, detail="Item not found")
         return {"success": True}
@@ -2,16 +2,45 @@
 Store for LangGraph SDK compatibility.
 Supports memory and DynamoDB backends via environment configuration.
 """
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+import copy
+from typing import Dict, Any, Optional, List, Tuple, Sequence
+import threading
+import time
 from store.factory import create_storage
 
+_GET_CACHE_TTL = 5.0  # seconds
+_GET_CACHE_SIZE = 1024
+
+
 class Store:
     """Store compatible with LangGraph SDK.
     
     Uses persistent storage (DynamoDB) or in-memory storage
     based on STORAGE_TYPE environment variable.
+    
+    Namespaces may be given as any sequence of strings; they are frozen to
+    tuples internally, so passing a tuple saves a copy.
+    
+    Reads are cached in-process for a short TTL. The cache is only coherent
+    within a single process: writes through this store invalidate the cached
+    key, but writes from other workers or processes are only seen once the
+    entry expires. Callers get a deep copy of the cached item, so mutating
+    the returned value doesn't affect other readers.
     """
     
+    __slots__ = (
+        "_storage",
+        "_storage_get",
+        "_storage_put",
+        "_storage_put_many",
+        "_storage_delete",
+        "_get_cache",
+        "_get_cache_lock",
+        "_generations",
+        "_generation_epoch",
+    )
+    
     def __init__(self, storage=None):
         """Initialize store with storage backend.
         
@@ -20,19 +49,87 @@ class Store:
                     will be created based on environment configuration.
         """
         self._storage = storage or create_storage()
+        # Backend methods bound once, so each call skips the _storage lookup
+        self._storage_get = self._storage.get_item
+        self._storage_put = self._storage.put_item
+        self._storage_put_many = self._storage.put_items
+        self._storage_delete = self._storage.delete_item
+        # (namespace, key) -> (expires_at, item); misses are cached as None too
+        self._get_cache: "OrderedDict[Tuple[Tuple[str, ...], str], Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._get_cache_lock = threading.RLock()
+        # Per-key write generation, bumped by invalidate(); a read is only cached
+        # if no write to its key happened while it was in flight. The epoch is
+        # bumped when the generations are reset, so in-flight reads of any key
+        # are dropped rather than compared against a forgotten generation
+        self._generations: Dict[Tuple[Tuple[str, ...], str], int] = {}
+        self._generation_epoch = 0
     
-    def get_item(self, namespace: List[str], key: str) -> Optional[Dict[str, Any]]:
+    def get_item(self, namespace: Sequence[str], key: str) -> Optional[Dict[str, Any]]:
         """Get an item from the store."""
-        return self._storage.get_item(namespace, key)
+        namespace = tuple(namespace)
+        cache_key = (namespace, key)
+        now = time.monotonic()
+        with self._get_cache_lock:
+            cached = self._get_cache.get(cache_key)
+            if cached is not None and cached[0] > now:
+                self._get_cache.move_to_end(cache_key)
+                return copy.deepcopy(cached[1])
+            generation = (self._generation_epoch, self._generations.get(cache_key, 0))
+        
+        item = self._storage_get(namespace, key)
+        with self._get_cache_lock:
+            if generation != (self._generation_epoch, self._generations.get(cache_key, 0)):
+                # Written while we were reading; the result may already be stale
+                return item
+            self._get_cache[cache_key] = (now + _GET_CACHE_TTL, item)
+            self._get_cache.move_to_end(cache_key)
+            if len(self._get_cache) > _GET_CACHE_SIZE:
+                self._get_cache.popitem(last=False)
+        # The cached item is kept private; the caller gets its own copy
+        return copy.deepcopy(item)
     
-    def put_item(self, namespace: List[str], key: str, value: Any) -> None:
+    def put_item(self, namespace: Sequence[str], key: str, value: Any) -> None:
         """Put an item into the store."""
-        self._storage.put_item(namespace, key, value)
+        namespace = tuple(namespace)
+        self._storage_put(namespace, key, value)
+        self.invalidate(namespace, key)
+    
+    def put_items(self, items: List[Tuple[Sequence[str], str, Any]]) -> None:
+        """Put several (namespace, key, value) items into the store in as few writes as the backend allows."""
+        self._storage_put_many(items)
+        for namespace, key, _ in items:
+            self.invalidate(namespace, key)
     
-    def delete_item(self, namespace: List[str], key: str) -> bool:
+    def delete_item(self, namespace: Sequence[str], key: str) -> bool:
         """Delete an item from the store."""
-        return self._storage.delete_item(namespace, key)
+        namespace = tuple(namespace)
+        deleted = self._storage_delete(namespace, key)
+        self.invalidate(namespace, key)
+        return deleted
+    
+    def invalidate(self, namespace: Sequence[str], key: str) -> None:
+        """Drop a cached item so the next get_item reads it from storage."""
+        cache_key = (tuple(namespace), key)
+        with self._get_cache_lock:
+            self._get_cache.pop(cache_key, None)
+            if len(self._generations) >= _GET_CACHE_SIZE * 4 and cache_key not in self._generations:
+                self._generations.clear()
+                self._generation_epoch += 1
+            self._generations[cache_key] = self._generations.get(cache_key, 0) + 1
+
+# Global store instance, created on first access (PEP 562 module __getattr__)
+# so importing this module doesn't set up the storage backend
+_store: Optional[Store] = None
+_store_lock = threading.Lock()
+
 
-# Global store instance
-store = Store()
+def __getattr__(name: str) -> Any:
+    global _store
+    if name == "store":
+        if _store is None:
+            with _store_lock:
+                if _store is None:
+                    _store = Store()
+        return _store
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
@@ -6,6 +6,14 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List
 
 
+def matches_metadata_filter(metadata: Dict, filters: Dict) -> bool:
+    """Check thread metadata against a filter.
+    
+    A filter key that is missing from the metadata does not exclude the thread.
+    """
+    return all(key not in metadata or metadata[key] == value for key, value in filters.items())
+
+
 class BaseThreadStorage(ABC):
     """Base interface for normalized thread storage."""
     
@@ -30,8 +38,8 @@ class BaseThreadStorage(ABC):
         pass
     
     @abstractmethod
-    def search_threads(self, limit: int = 100) -> List[Dict]:
-        """Search threads sorted by updated_at descending."""
+    def search_threads(self, limit: int = 100, filters: Optional[Dict] = None) -> List[Dict]:
+        """Search threads sorted by updated_at descending, optionally filtered by metadata."""
         pass
     
     @abstractmethod
@@ -0,0 +1,7 @@
+"""
+Pytest configuration: make the backend packages importable from any working directory.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
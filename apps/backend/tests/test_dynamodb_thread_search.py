@@ -0,0 +1,84 @@
+"""
+Tests for DynamoDBThreadStorage.search_threads against an in-memory fake table.
+"""
+import json
+from store.dynamodb_storage import DynamoDBThreadStorage
+
+
+class FakeThreadsTable:
+    """Threads table fake that pages scans like DynamoDB (Limit + LastEvaluatedKey)."""
+
+    def __init__(self, items):
+        self.items = items
+        self.scan_calls = 0
+
+    def scan(self, Limit, ExclusiveStartKey=None, **kwargs):
+        self.scan_calls += 1
+        start = 0
+        if ExclusiveStartKey is not None:
+            ids = [item["thread_id"] for item in self.items]
+            start = ids.index(ExclusiveStartKey["thread_id"]) + 1
+        page = self.items[start:start + Limit]
+        response = {"Items": [dict(item) for item in page]}
+        if start + Limit < len(self.items):
+            response["LastEvaluatedKey"] = {"thread_id": page[-1]["thread_id"]}
+        return response
+
+
+class FakeDynamoDB:
+    """Resource fake whose batch_get_item returns threads without messages."""
+
+    def __init__(self, table_name):
+        self.table_name = table_name
+
+    def batch_get_item(self, RequestItems):
+        keys = RequestItems[self.table_name]["Keys"]
+        return {"Responses": {self.table_name: [
+            {"thread_id": key["thread_id"], "messages": "[]"} for key in keys
+        ]}}
+
+
+def _make_storage(items):
+    storage = DynamoDBThreadStorage.__new__(DynamoDBThreadStorage)
+    storage.threads_table_name = "threads"
+    storage.threads_table = FakeThreadsTable(items)
+    storage.dynamodb = FakeDynamoDB("threads")
+    return storage
+
+
+def test_selective_filter_scans_past_first_page():
+    limit = 5
+    # Only the last 3 of 50 threads match; they sit well beyond the first 2*limit items
+    items = [
+        {
+            "thread_id": f"t{i:02d}",
+            "metadata": json.dumps({"user_id": "match" if i >= 47 else "other"}),
+            "created_at": f"2024-01-01T00:00:{i:02d}",
+            "updated_at": f"2024-01-01T00:00:{i:02d}",
+        }
+        for i in range(50)
+    ]
+    storage = _make_storage(items)
+
+    threads = storage.search_threads(limit=limit, filters={"user_id": "match"})
+
+    assert [t["thread_id"] for t in threads] == ["t49", "t48", "t47"]
+    assert storage.threads_table.scan_calls > 1
+
+
+def test_unfiltered_search_stops_once_enough_threads_are_read():
+    items = [
+        {
+            "thread_id": f"t{i:02d}",
+            "metadata": "{}",
+            "created_at": f"2024-01-01T00:00:{i:02d}",
+            "updated_at": f"2024-01-01T00:00:{i:02d}",
+        }
+        for i in range(50)
+    ]
+    storage = _make_storage(items)
+
+    threads = storage.search_threads(limit=5)
+
+    assert len(threads) == 5
+    assert storage.threads_table.scan_calls == 1
@@ -24,7 +24,8 @@ def generate_diagram_for_graph(
         generate_png: Whether to generate PNG diagram
         
     Returns:
-        tuple: (mermaid_file_path, png_file_path) or (None, None) on error
+        tuple: (mermaid_file_path, png_file_path) or (None, None) on error;
+            png_file_path is None if the PNG wasn't rendered
     """
     try:
         # Get the graph structure
@@ -72,6 +73,8 @@ def generate_diagram_for_graph(
                     print(f"PNG diagram saved to: {png_file}")
             except Exception as e:
                 print(f"Note: PNG generation skipped ({e})")
+                # A PNG left over from an earlier run doesn't count as rendered
+                png_file = None
         
         return (mermaid_file, png_file)
         
@@ -1613,8 +1613,8 @@ export function GraphProvider({ children }: { children: ReactNode }) {
               }
             }
 
-            // Handle generateTitle node output - save as thread title
-            if (langgraphNode === "generateTitle" && data?.output) {
+            // Handle postProcessing node output (reflection + title) - save title as thread title
+            if (langgraphNode === "postProcessing" && data?.output) {
               const output = data.output as { title?: string };
               const title = output?.title;
               